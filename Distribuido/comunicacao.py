@@ -1,5 +1,7 @@
 import pickle
+import queue
 import struct
+import threading
 
 """
 Módulo auxiliar para comunicação confiável via sockets.
@@ -7,27 +9,41 @@ Serializa e desserializa objetos Python usando pickle, com cabeçalho de tamanho
 """
 
 def send_msg(sock, data_object):
-    """Serializa e envia um objeto via socket com cabeçalho de tamanho."""
+    """
+    Serializa e envia um objeto via socket com cabeçalho de tamanho.
+
+    Retorna o número de bytes enviados, com o cabeçalho (0 em caso de erro).
+    """
     try:
         data_bytes = pickle.dumps(data_object)
         
-        # Envia cabeçalho com tamanho da mensagem (8 bytes)
+        # Cabeçalho com tamanho da mensagem (8 bytes)
         msg_len_header = struct.pack('!Q', len(data_bytes))
-        sock.sendall(msg_len_header)
         
-        # Envia os dados serializados
-        sock.sendall(data_bytes)
+        # Envia cabeçalho e dados em uma única chamada: dois envios pequenos
+        # seguidos esbarram no algoritmo de Nagle + ACK atrasado (~40 ms por passo)
+        sock.sendall(msg_len_header + data_bytes)
+        return len(msg_len_header) + len(data_bytes)
         
     except Exception as e:
         print(f"Erro ao enviar dados: {e}")
+        return 0
 
 def recv_msg(sock):
     """Recebe e desserializa uma mensagem do socket."""
+    return recv_msg_tamanho(sock)[0]
+
+def recv_msg_tamanho(sock):
+    """
+    Como recv_msg, mas retorna (objeto, bytes recebidos com o cabeçalho).
+
+    Em caso de erro ou conexão fechada, retorna (None, 0).
+    """
     try:
         # Lê cabeçalho de 8 bytes com tamanho da mensagem
         msg_len_header = sock.recv(8)
         if not msg_len_header:
-            return None  # Conexão fechada
+            return None, 0  # Conexão fechada
         
         msg_len = struct.unpack('!Q', msg_len_header)[0]
         
@@ -45,8 +61,56 @@ def recv_msg(sock):
         data_bytes = b''.join(data_bytes_list)
         
         # Desserializa os dados
-        return pickle.loads(data_bytes)
+        return pickle.loads(data_bytes), len(msg_len_header) + msg_len
     
     except Exception as e:
         print(f"Erro ao receber dados: {e}")
-        return None
\ No newline at end of file
+        return None, 0
+
+class CanalAssincrono:
+    """
+    Canal de comunicação com I/O em threads dedicadas.
+
+    O envio é feito por uma thread que consome uma fila, e o recebimento por
+    outra thread que lê e desserializa as mensagens assim que chegam. Assim o
+    chamador pode continuar calculando enquanto os dados trafegam na rede.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self._fila_envio = queue.Queue()
+        self._fila_recebimento = queue.Queue()
+
+        self._thread_envio = threading.Thread(target=self._loop_envio, daemon=True)
+        self._thread_recebimento = threading.Thread(target=self._loop_recebimento, daemon=True)
+        self._thread_envio.start()
+        self._thread_recebimento.start()
+
+    def _loop_envio(self):
+        """Envia, em ordem, os objetos colocados na fila (None encerra o loop)."""
+        while True:
+            data_object = self._fila_envio.get()
+            if data_object is None:
+                break
+            send_msg(self.sock, data_object)
+
+    def _loop_recebimento(self):
+        """Recebe mensagens continuamente até a conexão ser fechada."""
+        while True:
+            data_object = recv_msg(self.sock)
+            self._fila_recebimento.put(data_object)
+            if data_object is None:
+                break
+
+    def enviar(self, data_object):
+        """Agenda o envio de um objeto sem bloquear o chamador."""
+        self._fila_envio.put(data_object)
+
+    def receber(self):
+        """Bloqueia até a próxima mensagem estar disponível (None = conexão fechada)."""
+        return self._fila_recebimento.get()
+
+    def fechar(self):
+        """Esvazia a fila de envio e encerra a thread de envio."""
+        self._fila_envio.put(None)
+        self._thread_envio.join()
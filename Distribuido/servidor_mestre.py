@@ -1,301 +1,464 @@
+import argparse
 import time
 import os
-import csv
 import numpy as np
 import random
 import socket
+import sys
 import threading
 import comunicacao # Nosso módulo helper
 
+# Raiz do repositório no path, para importar o pacote compartilhado 'nasch'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nasch import autotune, backends, cache_estados, resultados
+from nasch.convergencia import MonitorConvergencia, PASSOS_MAXIMOS
+from nasch.regras import KERNELS
+from nasch.telemetria import PORTA as PORTA_TELEMETRIA, Telemetria
+
 # --- Parâmetros da Simulação ---
 # Define constantes globais para a simulação do modelo Nagel-Schreckenberg
 V_MAX = 5
 P_SLOWDOWN = 0.3
+KERNEL = "referencia"  # Kernel das regras usado pelos workers (ver nasch.regras.KERNELS)
 HOST = '127.0.0.1'  # localhost
 PORT = 65432
 
 # --- Estado Global do Servidor ---
-# Estruturas compartilhadas para coordenar resultados parciais entre threads
-worker_results_segments = {}
-lock = threading.Lock()
-barrier_calc = None  # Inicializada dinamicamente com o número de workers
+# Não há barreira nem lock globais: cada thread publica o que produz no
+# próprio mural e espera apenas pelos murais de que depende
+murais = []    # Bordas de cada worker (lidas pelos dois vizinhos)
+reducao = []   # Somas parciais da árvore de redução (lidas pelo nó pai)
+estatisticas = []  # (carros, soma das velocidades) de cada passo, escrito pela raiz
+
+# Modo adaptativo: a raiz alimenta o monitor e publica em 'decisoes', a cada
+# fim de lote, se a execução convergiu (lido uma vez por cada thread)
+monitor = None
+decisoes = None
+
+# Tempos médios por passo (interior, espera, borda) informados por cada worker
+tempos_fases = {}
 
-def handle_worker(conn, worker_id, num_workers, road_length, sim_steps):
+# Telemetria ao vivo (nasch.telemetria): um servidor por processo do Mestre,
+# aberto na primeira execução; PORTA_TELEMETRIA = 0 (ou None) desativa
+telemetria = None
+
+
+class Mural:
     """
-    Gerencia a comunicação inicial com um worker específico.
-    Calcula o segmento da estrada atribuído ao worker e envia configuração.
+    Valores publicados por uma thread, indexados pelo passo.
+
+    Cada valor é lido 'leitores' vezes e então descartado. As esperas usam a
+    Condition do próprio mural, então só quem depende deste mural é acordado.
     """
-    global worker_results_segments
-    
-    # Calcula o segmento da estrada para este worker
+
+    def __init__(self, leitores):
+        self.leitores = leitores
+        self.cond = threading.Condition()
+        self.dados = {}
+        self.abortado = False
+
+    def publicar(self, step, valor):
+        with self.cond:
+            self.dados[step] = [valor, self.leitores]
+            self.cond.notify_all()
+
+    def ler(self, step):
+        """Espera o valor do passo; retorna None se o mural foi abortado."""
+        with self.cond:
+            self.cond.wait_for(lambda: step in self.dados or self.abortado)
+            if step not in self.dados:
+                return None
+            entrada = self.dados[step]
+            entrada[1] -= 1
+            if entrada[1] == 0:
+                del self.dados[step]
+            return entrada[0]
+
+    def abortar(self):
+        """Libera quem espera por este mural (o worker dono caiu)."""
+        with self.cond:
+            self.abortado = True
+            self.cond.notify_all()
+
+
+def calcular_segmento(worker_id, num_workers, road_length):
+    """Retorna o intervalo [inicio, fim) da estrada atribuído ao worker."""
     chunk_size = road_length // num_workers
     start_index = worker_id * chunk_size
     end_index = road_length if worker_id == num_workers - 1 else (worker_id + 1) * chunk_size
+    return start_index, end_index
 
-    print(f"[Mestre] Worker {worker_id} cuidará dos índices {start_index}-{end_index-1}")
-    
-    try:
-        # Envia configuração inicial para o worker
-        task_config = {
-            'id': worker_id,
-            'start_index': start_index,
-            'end_index': end_index,
-            'sim_steps': sim_steps,
-            'v_max': V_MAX,
-            'p_slowdown': P_SLOWDOWN
-        }
-        comunicacao.send_msg(conn, task_config)
 
-    except Exception as e:
-        print(f"[Mestre-Thread-{worker_id}] Erro ao enviar config: {e}")
-        conn.close()
-        return  # Encerra a thread
-
-
-def run_simulation_distributed(road_length, density, sim_steps, num_workers):
+def run_simulation_distributed(road_length, density, sim_steps, num_workers, ao_escutar=None, seed=0,
+                               monitor_convergencia=None, kernel=KERNEL):
     """
     Executa uma simulação distribuída completa e retorna o tempo de execução.
     Coordena múltiplos workers via sockets e threads.
+
+    'kernel' é o nome do kernel de nasch.regras que os workers vão usar.
+
+    Com 'monitor_convergencia' (nasch.convergencia.MonitorConvergencia), a
+    execução para, de forma coletiva, assim que o fluxo converge; 'sim_steps'
+    vira o limite de passos.
+
+    'ao_escutar', se informado, é chamado logo após o socket começar a escutar
+    (usado para iniciar workers locais sem corrida com o bind).
     """
-    global worker_results_segments, lock, barrier_calc
-    
+    global murais, reducao, estatisticas, tempos_fases, monitor, decisoes, telemetria
+
+    # Sem nenhum passo, o worker não teria mensagem de bordas para esperar
+    if sim_steps < 1:
+        raise ValueError(f"A simulação precisa de ao menos 1 passo (recebido: {sim_steps}).")
+
+    # Cada segmento precisa ter ao menos V_MAX + 1 células: é o tamanho do
+    # halo e o alcance máximo de um carro que migra para o vizinho
+    if road_length // num_workers < V_MAX + 1:
+        raise ValueError(
+            f"Estrada de {road_length} células é pequena demais para {num_workers} workers."
+        )
+
     # Reinicializa estruturas globais para esta execução
-    barrier_calc = threading.Barrier(num_workers)
-    worker_results_segments = {}
-    
-    # Inicializa a estrada com carros posicionados aleatoriamente
-    road = np.full(road_length, -1)
+    murais = [Mural(leitores=2) for _ in range(num_workers)]
+    reducao = [Mural(leitores=1) for _ in range(num_workers)]
+    estatisticas = []
+    tempos_fases = {}
+    monitor = monitor_convergencia
+    decisoes = Mural(leitores=num_workers)
+
+    # Inicializa a estrada com um estado já equilibrado (cache em disco)
     num_cars = int(road_length * density)
     if num_cars == 0: return 0.0
-    car_positions = np.random.choice(road_length, num_cars, replace=False)
-    road[car_positions] = np.random.randint(0, V_MAX + 1, num_cars)
+    road = cache_estados.estado_inicial(road_length, density, V_MAX, P_SLOWDOWN, seed)
+
+    if telemetria is None and PORTA_TELEMETRIA:
+        servidor = Telemetria(porta=PORTA_TELEMETRIA)
+        try:
+            servidor.iniciar()
+            telemetria = servidor
+            print(f"[Mestre] Telemetria em {servidor.host}:{servidor.porta} "
+                  f"(acompanhe com: python -m nasch.telemetria).")
+        except OSError as e:
+            print(f"[Mestre] Telemetria desativada: {e}")
 
     # Configura socket do servidor e aguarda conexões dos workers
     client_connections = []
-    threads = []
-    
+
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         s.bind((HOST, PORT))
         s.listen(num_workers)
         print(f"\n[Mestre] Esperando {num_workers} trabalhadores em {HOST}:{PORT}...")
-        
+        if ao_escutar is not None:
+            ao_escutar()
+
         for i in range(num_workers):
             conn, addr = s.accept()
             print(f"[Mestre] Worker {i} (de {addr}) conectou.")
             client_connections.append(conn)
-            
-            # Inicia thread para gerenciar cada worker
-            thread = threading.Thread(
-                target=handle_worker, 
-                args=(conn, i, num_workers, road_length, sim_steps)
-            )
-            thread.start()
-            threads.append(thread)
-            
-    print(f"[Mestre] Todos os {num_workers} trabalhadores conectados. Iniciando simulação.")
+
+    print(f"[Mestre] Todos os {num_workers} trabalhadores conectados. Medindo tempo.")
+
+    # Uma thread por worker; todas compartilham o array 'road', que recebe
+    # o estado final quando cada worker devolve seu segmento
+    threads = []
+    for i, conn in enumerate(client_connections):
+        thread = threading.Thread(
+            target=handle_worker_full_loop,
+            args=(conn, i, num_workers, road_length, sim_steps, road, kernel)
+        )
+        threads.append(thread)
+
+    if telemetria is not None:
+        telemetria.nova_execucao(num_workers, road_length, sim_steps)
 
     # Mede o tempo de execução da simulação
     start_time = time.perf_counter()
 
-    # Loop principal da simulação - coordenado pelo mestre
-    for step in range(sim_steps):
-        
-        # Limpa resultados parciais do passo anterior
-        worker_results_segments = {}
-        
-        # Prepara dados da estrada para envio
-        task_data = {'road': road}
-        
-        # Envia estado atual da estrada para todos os workers
-        for conn in client_connections:
-            comunicacao.send_msg(conn, task_data)
-
-        # Recebe resultados parciais de todos os workers
-        # Nota: Lógica simplificada; threads handle_worker gerenciam comunicação
-        
-        # Delegação: Threads handle_worker executam o loop completo
-        pass  # Lógica delegada para threads
-        
+    for t in threads:
+        t.start()
+
     # Aguarda conclusão de todas as threads
     for t in threads:
         t.join()
-        
+
     end_time = time.perf_counter()
-    
-    # Fecha conexões
-    for conn in client_connections:
-        conn.close()
-        
+
+    if telemetria is not None:
+        telemetria.fim_execucao()
+
     print("[Mestre] Simulação concluída.")
     return end_time - start_time
 
-def handle_worker_full_loop(conn, worker_id, num_workers, road_length, sim_steps, road):
+def reduzir_passo(worker_id, filhos, step, carros, soma_v, road_length):
+    """
+    Soma os valores do worker aos das subárvores dos filhos e os repassa ao pai.
+
+    A raiz (worker 0) registra o total do passo em 'estatisticas' e, no modo
+    adaptativo, alimenta o monitor e publica a decisão de parada a cada fim
+    de lote. Retorna False se algum filho caiu antes de publicar.
+    """
+    for filho in filhos:
+        parcial = reducao[filho].ler(step)
+        if parcial is None:
+            return False
+        carros += parcial[0]
+        soma_v += parcial[1]
+
+    if worker_id == 0:
+        estatisticas.append((carros, soma_v))
+        if monitor is not None:
+            monitor.adicionar(soma_v / road_length, soma_v / carros)
+            if monitor.fim_de_lote(step + 1):
+                decisoes.publicar(step, monitor.convergiu)
+    else:
+        reducao[worker_id].publicar(step, (carros, soma_v))
+    return True
+
+
+def handle_worker_full_loop(conn, worker_id, num_workers, road_length, sim_steps, road, kernel=KERNEL):
     """
     Gerencia o loop completo de simulação para um worker específico.
-    Coordena comunicação, cálculo parcial e sincronização via barreiras.
+
+    O worker mantém o próprio segmento; a cada passo ele envia apenas o halo
+    (primeiras V_MAX + 1 células), os carros que saíram pela direita e as
+    somas do seu segmento. Esta thread publica essas bordas no seu mural e
+    espera só pelos murais dos dois vizinhos (não há barreira global).
+
+    As somas de cada passo sobem por uma árvore binária (nó i tem filhos
+    2i+1 e 2i+2) até a raiz, que registra os totais em 'estatisticas': a
+    profundidade é O(log workers) e a redução roda enquanto o worker calcula.
+    No fim, cada thread grava o segmento final direto na sua fatia de 'road'.
+
+    No modo adaptativo, a parada é coletiva: ao fim de cada lote, a raiz
+    publica a decisão e, no passo seguinte, todas as threads a leem antes de
+    responder. Assim todos os workers param depois do mesmo passo.
     """
-    global worker_results_segments, lock, barrier_calc
-    
-    print(f"[Debug-Thread-{worker_id}] Recebi sim_steps = {sim_steps}")
-    
-    # Calcula o segmento da estrada atribuído a este worker
-    chunk_size = road_length // num_workers
-    start_index = worker_id * chunk_size
-    end_index = road_length if worker_id == num_workers - 1 else (worker_id + 1) * chunk_size
+    start_index, end_index = calcular_segmento(worker_id, num_workers, road_length)
+    tam_halo = V_MAX + 1
+
+    # Vizinhos na estrada circular e filhos na árvore de redução
+    esquerda = (worker_id - 1) % num_workers
+    direita = (worker_id + 1) % num_workers
+    filhos = [f for f in (2 * worker_id + 1, 2 * worker_id + 2) if f < num_workers]
 
     print(f"[Mestre-Thread-{worker_id}] Cuidará de {start_index}-{end_index-1}")
-    
+
     try:
-        # Envia configuração inicial ao worker
+        # Envia configuração inicial: o segmento e o halo da direita do passo 0
+        halo_indices = np.arange(end_index, end_index + tam_halo) % road_length
         task_config = {
             'id': worker_id, 'start_index': start_index, 'end_index': end_index,
-            'sim_steps': sim_steps, 'v_max': V_MAX, 'p_slowdown': P_SLOWDOWN
+            'sim_steps': sim_steps, 'v_max': V_MAX, 'p_slowdown': P_SLOWDOWN, 'kernel': kernel,
+            'segmento': road[start_index:end_index].copy(),
+            'halo': road[halo_indices]
         }
-        comunicacao.send_msg(conn, task_config)
+        enviados = comunicacao.send_msg(conn, task_config)
+        if telemetria is not None:
+            telemetria.contar_bytes(worker_id, enviados=enviados)
 
         # Loop principal da simulação para este worker
+        concluiu = False
         for step in range(sim_steps):
-            # Envia estado atual da estrada
-            task_data = {'road': road}
-            comunicacao.send_msg(conn, task_data)
-            
-            # Recebe resultados parciais do worker
-            partial_results = comunicacao.recv_msg(conn)
-            if partial_results is None:
+            # Recebe as bordas calculadas pelo worker neste passo
+            bordas, recebidos = comunicacao.recv_msg_tamanho(conn)
+            if bordas is None:
                 print(f"[Mestre-Thread-{worker_id}] Worker desconectou inesperadamente.")
                 break
-            
-            # Armazena resultados com sincronização
-            with lock:
-                worker_results_segments.update(partial_results)
-            
-            # Sincroniza com outros workers
-            barrier_calc.wait()
-            
-            # Thread principal (worker 0) consolida resultados
-            if worker_id == 0:
-                next_road = np.full(road_length, -1)
-                
-                # Atualiza estrada com contribuições de todos os workers
-                for pos, vel in worker_results_segments.items():
-                    next_road[pos] = vel
-                
-                # Atualiza estado global da estrada
-                road[:] = next_road[:]
-                
-                # Limpa resultados para próximo passo
-                worker_results_segments = {}
-            
-            # Sincroniza antes do próximo envio
-            barrier_calc.wait()
-            
-        # Sinaliza término da simulação ao worker
-        comunicacao.send_msg(conn, {'status': 'TERMINAR'})
-        print(f"[Mestre-Thread-{worker_id}] Simulação terminada. Enviando sinal de fim.")
+
+            murais[worker_id].publicar(step, bordas)
+
+            # Espera apenas os dois vizinhos
+            bordas_direita = murais[direita].ler(step)
+            bordas_esquerda = murais[esquerda].ler(step)
+            if bordas_direita is None or bordas_esquerda is None:
+                break  # Um vizinho caiu
+
+            # Modo adaptativo: decisão coletiva tomada no fim do lote anterior
+            parar = False
+            if monitor is not None and step > 0 and monitor.fim_de_lote(step):
+                parar = decisoes.ler(step - 1)
+                if parar is None:
+                    break  # A raiz caiu
+
+            # Repassa ao worker o halo do vizinho da direita e as saídas do da esquerda
+            enviados = comunicacao.send_msg(conn, {
+                'halo': bordas_direita['halo'],
+                'entradas': bordas_esquerda['saidas'],
+                'parar': parar
+            })
+
+            # Telemetria: só contadores deste worker (a amostragem roda em outra thread)
+            if telemetria is not None:
+                telemetria.contar_bytes(worker_id, recebidos, enviados)
+                telemetria.passo_concluido(worker_id)
+
+            # Redução em árvore das somas deste passo (o worker já está calculando)
+            if not reduzir_passo(worker_id, filhos, step, bordas['carros'], bordas['soma_v'], road_length):
+                break  # Um filho caiu
+
+            if parar:
+                concluiu = True
+                break
+        else:
+            concluiu = True
+
+        if concluiu:
+            # Recebe o segmento final e grava na fatia disjunta de 'road'
+            final = comunicacao.recv_msg(conn)
+            if final is not None:
+                road[start_index:end_index] = final['segmento']
+                interior, espera, borda = np.mean(final['tempos'], axis=0)
+                tempos_fases[worker_id] = (interior, espera, borda)
+                print(f"[Mestre-Thread-{worker_id}] Tempos médios do worker: "
+                      f"interior={interior*1e3:.3f} ms, espera={espera*1e3:.3f} ms, "
+                      f"borda={borda*1e3:.3f} ms")
+
+            # Sinaliza término da simulação ao worker
+            comunicacao.send_msg(conn, {'status': 'TERMINAR'})
+            print(f"[Mestre-Thread-{worker_id}] Simulação terminada. Enviando sinal de fim.")
 
     except Exception as e:
         print(f"[Mestre-Thread-{worker_id}] Erro no loop: {e}")
     finally:
+        # Libera vizinhos e pai que ainda esperem por esta thread
+        murais[worker_id].abortar()
+        reducao[worker_id].abortar()
+        if worker_id == 0:
+            decisoes.abortar()
         conn.close()
 
 
+def linha_resultado(road_length, density, sim_steps, num_workers, tempo, kernel=KERNEL):
+    """
+    Linha do armazenamento de resultados para a última execução, com os tempos
+    por fase (média por passo entre os workers) e o fluxo médio da estrada.
+    """
+    linha = {
+        'backend': "sockets",
+        'comprimento': road_length, 'densidade': density,
+        'passos': monitor.passos if monitor is not None else sim_steps,
+        'v_max': V_MAX, 'p_slowdown': P_SLOWDOWN,
+        'workers': num_workers, 'kernel': kernel, 'seed': 0, 'tempo_s': tempo,
+    }
+    if tempos_fases:
+        interior, espera, borda = np.mean(list(tempos_fases.values()), axis=0)
+        linha.update({
+            'tempo_interior_s': interior,
+            'tempo_espera_s': espera,
+            'tempo_borda_s': borda,
+        })
+    if estatisticas:
+        # Fluxo = carros que avançam uma célula por passo, por célula
+        linha['fluxo_medio'] = np.mean([soma_v for _, soma_v in estatisticas]) / road_length
+    if monitor is not None:
+        linha.update(monitor.colunas(sim_steps))
+    return linha
+
+
+def run_benchmark_local(num_workers, road_length, density, sim_steps, erro_alvo=None, kernel=KERNEL):
+    """
+    Roda um único teste com 'num_workers' processos worker.py nesta máquina.
+
+    Os workers são iniciados automaticamente, então dá para medir a escala
+    com muitos workers (ex.: 32 ou 64) sem abrir um terminal para cada um.
+    """
+    processos = []
+    tempo = run_simulation_distributed(
+        road_length, density, sim_steps, num_workers,
+        ao_escutar=lambda: processos.extend(backends.iniciar_workers_locais(num_workers)),
+        monitor_convergencia=MonitorConvergencia(erro_alvo) if erro_alvo else None,
+        kernel=kernel
+    )
+    for p in processos:
+        p.wait()
+
+    print(f"\n[Benchmark] Workers={num_workers}, Comp={road_length}, Dens={density}, Passos={sim_steps}, "
+          f"Kernel={kernel}")
+    passos = monitor.passos if monitor is not None else sim_steps
+    print(f"    -> Tempo: {tempo:.4f} segundos ({passos / tempo:.1f} passos/s)")
+    if monitor is not None:
+        print(f"    -> Passos: {passos} de no máximo {sim_steps} "
+              f"(erro relativo: {monitor.erro_relativo:.2%})")
+
+    # Conferência: a redução em árvore deve ver o mesmo número de carros em todo passo
+    carros = {c for c, _ in estatisticas}
+    if len(estatisticas) == passos and carros == {int(road_length * density)}:
+        print(f"    -> Carros conservados em todos os {passos} passos.")
+    else:
+        print(f"    -> ATENÇÃO: redução incompleta ou carros não conservados ({sorted(carros)}).")
+
+    resultados.anexar([linha_resultado(road_length, density, sim_steps, num_workers, tempo, kernel)])
+
+
 def run_experiments_distributed():
-    """Executa bateria de testes distribuídos e salva resultados em CSV."""
-    global worker_results_segments, lock, barrier_calc
-    
+    """
+    Executa bateria de testes distribuídos e acrescenta cada execução ao
+    armazenamento de resultados (nasch.resultados).
+    """
     print("Iniciando bateria de testes distribuídos (Sockets)...")
 
     # Configurações dos experimentos
     comprimentos_estrada = [1000, 5000, 10000]  # Tamanhos de estrada testados
     densidades = [0.1, 0.3]  # Densidades de tráfego
     passos_simulacao = 200  # Número de passos por simulação
-    lista_num_workers = [2, 4]  # Número de workers a testar
-    
-    resultados = []
+    lista_num_workers = [2, 4]  # Número de workers a testar ("auto" = modelo de custo)
+
+    # Modo adaptativo: cada execução para quando o fluxo converge
+    # (o limite de passos passa a ser passos_maximos)
+    adaptativo = False
+    erro_alvo = 0.01
+    passos_maximos = PASSOS_MAXIMOS
+
+    limite = passos_maximos if adaptativo else passos_simulacao
 
-    for num_w in lista_num_workers:
+    for opcao_w in lista_num_workers:
         for comp in comprimentos_estrada:
             for dens in densidades:
-                
+
+                num_w = opcao_w
+                if opcao_w == "auto":
+                    num_w = autotune.escolher_paralelismo("sockets", comp, dens, limite)
+
                 print(f"  Testando: Workers={num_w}, Comp={comp}, Dens={dens}...")
-                
-                # Reinicializa estruturas para cada teste
-                barrier_calc = threading.Barrier(num_w)
-                worker_results_segments = {}
-                
-                # Inicializa estrada com carros
-                road = np.full(comp, -1)
-                num_cars = int(comp * dens)
-                if num_cars > 0:
-                    car_pos = np.random.choice(comp, num_cars, replace=False)
-                    road[car_pos] = np.random.randint(0, V_MAX + 1, num_cars)
-
-                # Configura servidor e aguarda workers
-                client_connections = []
-                threads = []
-                
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.bind((HOST, PORT))
-                    s.listen(num_w)
-                    print(f"\n[Mestre] Esperando {num_w} trabalhadores em {HOST}:{PORT}...")
-                    
-                    for i in range(num_w):
-                        conn, addr = s.accept()
-                        print(f"[Mestre] Worker {i} (de {addr}) conectou.")
-                        client_connections.append(conn)
-                        
-                        # Inicia thread para gerenciar worker
-                        thread = threading.Thread(
-                            target=handle_worker_full_loop, 
-                            args=(conn, i, num_w, comp, passos_simulacao, road)
-                        )
-                        thread.start()
-                        threads.append(thread)
-                        
-                print(f"[Mestre] Todos os {num_w} trabalhadores conectados. Medindo tempo.")
-                
-                # Mede tempo de execução
-                start_time = time.perf_counter()
-
-                # Aguarda conclusão das simulações
-                for t in threads:
-                    t.join()
-                    
-                end_time = time.perf_counter()
-                tempo = end_time - start_time
-
-                print(f"[Mestre] Simulação concluída.")
+
+                tempo = run_simulation_distributed(
+                    comp, dens, limite, num_w,
+                    monitor_convergencia=MonitorConvergencia(erro_alvo) if adaptativo else None
+                )
+
                 print(f"    -> Tempo: {tempo:.4f} segundos")
+                if monitor is not None:
+                    print(f"    -> Passos: {monitor.passos} (erro relativo: {monitor.erro_relativo:.2%})")
 
-                # Registra resultados
-                resultados.append([
-                    f"Distribuido ({num_w} workers)",
-                    comp, dens, passos_simulacao,
-                    V_MAX, P_SLOWDOWN, num_w, tempo
-                ])
-
-    # Salva resultados em CSV
-    output_dir = "arquivos"
-    output_file = os.path.join(output_dir, "resultados_distribuido.csv")
-    
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        
-    print(f"\nSalvando resultados em '{output_file}'...")
-    
-    try:
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "Tipo_Execucao", "Comprimento_Estrada", "Densidade", 
-                "Passos_Simulacao", "V_Max", "P_Slowdown", 
-                "Num_Workers", "Tempo_s"
-            ])
-            writer.writerows(resultados)
-        print("Resultados salvos com sucesso.")
-    except IOError as e:
-        print(f"Erro ao salvar arquivo: {e}")
+                # Acrescenta a execução ao armazenamento
+                resultados.anexar([linha_resultado(comp, dens, limite, num_w, tempo)])
+
+    print(f"\nResultados salvos em '{resultados.DIRETORIO_RESULTADOS}'.")
+    print("Use 'python -m nasch.analise tabela' para ver speedup e eficiência.")
 
 if __name__ == "__main__":
-    # Executa os experimentos distribuídos quando o script é rodado diretamente
-    run_experiments_distributed()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Mestre da simulação distribuída.")
+    parser.add_argument("--locais", type=int, metavar="N",
+                        help="Roda um único teste com N workers locais (iniciados automaticamente).")
+    parser.add_argument("--comprimento", type=int, default=20000)
+    parser.add_argument("--densidade", type=float, default=0.3)
+    parser.add_argument("--passos", type=int,
+                        help="Passos (padrão: 200; no modo adaptativo é o limite máximo, "
+                             f"padrão {PASSOS_MAXIMOS}).")
+    parser.add_argument("--erro-alvo", type=float,
+                        help="Ativa o modo adaptativo com este erro relativo alvo (ex.: 0.01).")
+    parser.add_argument("--kernel", choices=list(KERNELS), default=KERNEL,
+                        help="Kernel das regras usado pelos workers.")
+    parser.add_argument("--porta-telemetria", type=int, default=PORTA_TELEMETRIA,
+                        help="Porta da telemetria ao vivo (0 desativa).")
+    args = parser.parse_args()
+    PORTA_TELEMETRIA = args.porta_telemetria
+    if args.passos is None:
+        args.passos = PASSOS_MAXIMOS if args.erro_alvo else 200
+
+    if args.locais:
+        run_benchmark_local(args.locais, args.comprimento, args.densidade, args.passos, args.erro_alvo,
+                            args.kernel)
+    else:
+        # Executa os experimentos distribuídos quando o script é rodado diretamente
+        run_experiments_distributed()
\ No newline at end of file
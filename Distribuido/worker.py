@@ -1,58 +1,24 @@
+import os
 import socket
+import sys
 import numpy as np
-import random
 import time
 import comunicacao # Nosso módulo helper
 
+# Raiz do repositório no path, para importar o pacote compartilhado 'nasch'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nasch.regras import Estado, obter_kernel
+
 HOST = '127.0.0.1'  # Endereço IP do servidor mestre
 PORT = 65432
 
-def run_na_sch_rules(road, start_index, end_index, v_max, p_slow):
-    """
-    Aplica as regras do modelo Nagel-Schreckenberg a um segmento da estrada.
-    Retorna um dicionário com as novas posições e velocidades dos carros no segmento.
-    """
-    partial_results = {}
-    road_length = len(road)
-    
-    # Processa apenas o segmento atribuído a este worker
-    for i in range(start_index, end_index):
-        
-        # Ignora células vazias
-        if road[i] == -1:
-            continue
-
-        # Aplica as quatro regras do NaSch para o carro na posição i
-        v_atual = road[i]
-        
-        # Regra 1: Calcula a distância até o próximo carro (com wrap-around)
-        distancia = 1
-        while road[(i + distancia) % road_length] == -1:
-            distancia += 1
-            if distancia > v_max + 1:
-                break
-        
-        # Regra 2: Aceleração
-        v_nova = min(v_atual + 1, v_max)
-        
-        # Regra 3: Desaceleração para evitar colisão
-        v_nova = min(v_nova, distancia - 1)
-        
-        # Regra 4: Aleatorização (slowdown probabilístico)
-        if v_nova > 0 and random.random() < p_slow:
-            v_nova -= 1
-            
-        # Calcula nova posição após movimento
-        nova_posicao = (i + v_nova) % road_length
-        
-        # Registra resultado parcial para envio ao mestre
-        partial_results[nova_posicao] = v_nova
-        
-    return partial_results
+# Imprime os tempos de cada passo (interior / espera / borda); útil para
+# conferir a sobreposição, mas o print no laço pesa nas medições
+MOSTRAR_TEMPOS_POR_PASSO = False
 
 def main():
     """Executa o loop principal do worker: conecta ao mestre e processa simulações."""
-    
+
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         try:
             s.connect((HOST, PORT))
@@ -74,32 +40,109 @@ def main():
         sim_steps = config['sim_steps']
         v_max = config['v_max']
         p_slowdown = config['p_slowdown']
-        
-        print(f"[Worker {worker_id}] Tarefa recebida. Responsável por {start_index}-{end_index-1}")
-
-        # Loop de simulação: recebe tarefas e envia resultados
-        while True:
-            # Recebe dados da tarefa ou sinal de término
-            task_data = comunicacao.recv_msg(s)
-            
-            if task_data is None:
-                print(f"[Worker {worker_id}] Mestre desconectou.")
-                break
-            
-            if task_data.get('status') == 'TERMINAR':
-                print(f"[Worker {worker_id}] Sinal de término recebido. Encerrando.")
-                break
-
-            road = task_data['road']
-            
-            # Processa o segmento da estrada
-            partial_results = run_na_sch_rules(
-                road, start_index, end_index, v_max, p_slowdown
-            )
-            
-            # Envia resultados parciais ao mestre
-            comunicacao.send_msg(s, partial_results)
-            
+        passo = obter_kernel(config['kernel'])
+        rng = np.random.default_rng()
+
+        # O worker guarda o próprio segmento entre os passos; só as bordas trafegam
+        segmento = np.array(config['segmento'])
+        halo = np.array(config['halo'])
+        n = len(segmento)
+        tam_halo = v_max + 1
+
+        # Interior: carros que não leem células do vizinho da direita nem
+        # podem ser alcançados pelos carros que chegam do vizinho da esquerda
+        inicio_interior = min(v_max, n)
+        fim_interior = max(inicio_interior, n - tam_halo)
+
+        print(f"[Worker {worker_id}] Tarefa recebida. Responsável por {start_index}-{end_index-1} "
+              f"(kernel {config['kernel']})")
+
+        # A partir daqui o envio e o recebimento correm em threads de I/O
+        canal = comunicacao.CanalAssincrono(s)
+        saidas = []  # Carros enviados ao vizinho da direita no passo anterior
+        tempos = []  # (interior, espera, borda) por passo
+        parou = False  # Parada antecipada decidida pelo mestre (modo adaptativo)
+
+        for step in range(sim_steps):
+            t0 = time.perf_counter()
+
+            # --- FASE 1: interior (não depende de dados dos vizinhos) ---
+            # O kernel trabalha sobre o segmento estendido (segmento + halo da
+            # direita): a busca pela distância nunca passa do fim do halo, e as
+            # posições além do fim do segmento são carros que migram para o vizinho
+            estendido = np.full(n + tam_halo, -1)
+            estendido[:n] = segmento
+            next_road = np.full(n + tam_halo, -1)
+            estado = Estado(estendido, next_road, v_max, p_slowdown)
+            passo(estado, rng, (inicio_interior, fim_interior))
+            t1 = time.perf_counter()
+
+            # --- FASE 2: espera as bordas do passo anterior (já em trânsito) ---
+            if step > 0:
+                task_data = canal.receber()
+                if task_data is None:
+                    print(f"[Worker {worker_id}] Mestre desconectou.")
+                    return
+                if task_data.get('parar'):
+                    # Parada coletiva: o estado final é o do passo anterior mais
+                    # os carros que chegaram; o interior já calculado é descartado
+                    for pos, vel in task_data['entradas']:
+                        segmento[pos] = vel
+                    parou = True
+                    break
+                # O halo do vizinho não inclui os carros que nós mesmos mandamos para lá
+                halo = np.array(task_data['halo'])
+                for pos, vel in saidas:
+                    halo[pos] = vel
+                for pos, vel in task_data['entradas']:
+                    estendido[pos] = vel
+            estendido[n:] = halo
+            t2 = time.perf_counter()
+
+            # --- FASE 3: bordas esquerda e direita ---
+            passo(estado, rng, (0, inicio_interior))
+            passo(estado, rng, (fim_interior, n))
+
+            segmento = next_road[:n]
+            saidas = [(pos, int(vel)) for pos, vel in enumerate(next_road[n:]) if vel != -1]
+
+            # O halo enviado contém só os carros próprios; o vizinho da esquerda
+            # acrescenta as suas saídas, que são exatamente as que chegam aqui
+            # Somas do passo (carros próprios + os que saíram), reduzidas pelo mestre
+            velocidades = next_road[next_road != -1]
+            canal.enviar({
+                'halo': segmento[:tam_halo].copy(), 'saidas': saidas,
+                'carros': len(velocidades), 'soma_v': int(velocidades.sum())
+            })
+            t3 = time.perf_counter()
+
+            tempos.append((t1 - t0, t2 - t1, t3 - t2))
+            if MOSTRAR_TEMPOS_POR_PASSO:
+                print(f"[Worker {worker_id}] Passo {step}: interior={(t1 - t0)*1e3:.3f} ms, "
+                      f"espera={(t2 - t1)*1e3:.3f} ms, borda={(t3 - t2)*1e3:.3f} ms")
+
+        # Integra os carros que chegaram no último passo e devolve o segmento final
+        # (sem nenhum passo calculado, não há resposta pendente a esperar)
+        if not parou and sim_steps > 0:
+            task_data = canal.receber()
+            if task_data is not None:
+                for pos, vel in task_data['entradas']:
+                    segmento[pos] = vel
+        canal.enviar({'segmento': segmento, 'tempos': tempos})
+
+        # Aguarda o sinal de término
+        task_data = canal.receber()
+        if task_data is not None and task_data.get('status') == 'TERMINAR':
+            print(f"[Worker {worker_id}] Sinal de término recebido. Encerrando.")
+        canal.fechar()
+
+        if tempos:
+            interior, espera, borda = np.mean(tempos, axis=0)
+            sobreposicao = interior / (interior + espera) if interior + espera > 0 else 0.0
+            print(f"[Worker {worker_id}] Médias por passo: interior={interior*1e3:.3f} ms, "
+                  f"espera={espera*1e3:.3f} ms, borda={borda*1e3:.3f} ms "
+                  f"(cálculo sobreposto à comunicação: {sobreposicao:.0%})")
+
         print(f"[Worker {worker_id}] Desconectando.")
 
 if __name__ == "__main__":
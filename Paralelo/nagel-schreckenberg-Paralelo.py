@@ -1,123 +1,127 @@
 import time
 import os
-import csv
 import numpy as np
-import random
+import sys
 import threading
 
+# Raiz do repositório no path, para importar o pacote compartilhado 'nasch'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nasch import autotune, cache_estados, resultados
+from nasch.convergencia import MonitorConvergencia, PASSOS_MAXIMOS
+from nasch.regras import Estado, obter_kernel
+
 # --- Parâmetros da Simulação (iguais ao sequencial) ---
 V_MAX = 5
 P_SLOWDOWN = 0.3
+KERNEL = "vetorizado"  # Kernel das regras (ver nasch.regras.KERNELS)
 
-def worker_thread(thread_id, num_threads, road_length, sim_steps, road, next_road, barrier_calc, barrier_copy):
+def worker_thread(thread_id, num_threads, road_length, sim_steps, buffers, barrier_calc, somas, parar,
+                  passo, erros):
     """
     Função que cada thread executará.
-    Ela processa apenas o seu "pedaço" (chunk) da estrada.
+    Ela processa apenas o seu "pedaço" (chunk) da estrada, com o kernel 'passo'.
+
+    Os buffers são trocados por referência: a cada passo a thread lê
+    'buffers[t % 3]' e escreve em 'buffers[(t + 1) % 3]'. Com só dois buffers,
+    limpar o próximo exigiria uma segunda barreira (outra thread poderia
+    escrever nele antes da limpeza). Com três, a thread limpa o seu pedaço do
+    buffer que será escrito no passo SEGUINTE, que ninguém está lendo nem
+    escrevendo agora. Resta uma única barreira por passo.
+
+    Um erro na thread é guardado em 'erros' e quebra a barreira, para que as
+    outras threads não fiquem esperando para sempre.
     """
-    
+
     # 1. Calcular qual pedaço da estrada esta thread vai cuidar
     chunk_size = road_length // num_threads
     start_index = thread_id * chunk_size
-    
+
     # A última thread pega todo o resto (caso não seja divisível)
     end_index = road_length if thread_id == num_threads - 1 else (thread_id + 1) * chunk_size
 
+    # Gerador próprio: o gerador do NumPy não deve ser compartilhado entre threads
+    rng = np.random.default_rng()
+    estado = Estado(None, None, V_MAX, P_SLOWDOWN)
+
     # --- Loop de Simulação (dentro da thread) ---
-    for _ in range(sim_steps):
-        
-        # --- FASE 1: CÁLCULO ---
-        # A thread só itera sobre o SEU PEDAÇO
-        for i in range(start_index, end_index):
-            
-            # Se a célula NÃO tiver um carro, pule
-            if road[i] == -1:
-                continue
-
-            # --- É um carro. Aplicar as 4 regras do NaSch ---
-            v_atual = road[i]
-            
-            # Regra 0: Encontrar a distância (d) para o próximo carro
-            distancia = 1
-            # A thread LÊ o array 'road' global (o que é seguro)
-            # Ela pode precisar ler "além" do seu pedaço
-            while road[(i + distancia) % road_length] == -1:
-                distancia += 1
-                if distancia > V_MAX + 1:
-                    break
-            
-            # Regra 1: Aceleração
-            v_nova = min(v_atual + 1, V_MAX)
-            
-            # Regra 2: Desaceleração (Evitar Colisão)
-            v_nova = min(v_nova, distancia - 1)
-            
-            # Regra 3: Aleatorização
-            if v_nova > 0 and random.random() < P_SLOWDOWN:
-                v_nova = v_nova - 1
-                
-            # Regra 4: Movimento
-            nova_posicao = (i + v_nova) % road_length
-            
-            # A thread ESCREVE no array global 'next_road'
-            # Isso é seguro, pois cada thread é "dona" do carro 'i'
-            next_road[nova_posicao] = v_nova
-
-        # --- FIM DA FASE 1 ---
-
-        # Sincronização: Espera todas as threads terminarem o CÁLCULO
-        barrier_calc.wait()
-        
-        # --- FASE 2: CÓPIA ---
-        # Agora que 'next_road' está completo, copiamos de volta para 'road'
-        # Cada thread copia o seu próprio pedaço para manter o paralelismo
-        
-        # Limpa o pedaço do 'road' antes de copiar
-        road[start_index:end_index] = -1 
-        
-        # Copia apenas os carros que "aterrissaram" no seu pedaço
-        for i in range(start_index, end_index):
-             if next_road[i] != -1:
-                road[i] = next_road[i]
-                next_road[i] = -1 # Limpa para o próximo ciclo
-
-        # --- FIM DA FASE 2 ---
-        
-        # Sincronização: Espera todas as threads terminarem a CÓPIA
-        # antes de começar o próximo passo da simulação
-        barrier_copy.wait()
-
-
-def run_simulation_parallel(road_length, density, sim_steps, num_threads):
+    try:
+        for step in range(sim_steps):
+            # A thread LÊ o buffer do passo inteiro (pode precisar ler "além" do
+            # seu pedaço) e ESCREVE só os carros que são seus
+            estado.road = buffers[step % 3]
+            estado.next_road = buffers[(step + 1) % 3]
+
+            # Prepara o buffer do passo seguinte (só o pedaço desta thread)
+            buffers[(step + 2) % 3][start_index:end_index] = -1
+
+            somas[thread_id] = passo(estado, rng, (start_index, end_index))
+
+            # Sincronização: o próximo passo só começa com 'next_road' completo
+            barrier_calc.wait()
+
+            # Modo adaptativo: a decisão (tomada na barreira) vale para todas
+            if parar[0]:
+                break
+    except Exception as erro:
+        erros.append(erro)
+        barrier_calc.abort()
+
+
+def run_simulation_parallel(road_length, density, sim_steps, num_threads, kernel=KERNEL, seed=0,
+                            monitor=None):
     """
     Executa uma única simulação paralela com 'num_threads'.
+
+    'kernel' escolhe a implementação das regras em nasch.regras. O padrão,
+    "vetorizado", libera o GIL nas operações pesadas, então as threads rodam
+    de fato em paralelo; "referencia" é o laço célula a célula original.
+
+    Com um 'monitor' (nasch.convergencia.MonitorConvergencia), a simulação
+    para assim que o fluxo converge; 'sim_steps' vira o limite de passos.
+
+    Kernel desconhecido levanta ValueError antes de criar as threads; um erro
+    dentro de uma thread é levantado de novo aqui.
     """
+    passo = obter_kernel(kernel)
     
-    # 1. Inicialização da Estrada (igual ao sequencial)
-    road = np.full(road_length, -1)
+    # 1. Inicialização da Estrada (igual ao sequencial: estado aquecido do cache)
     num_cars = int(road_length * density)
     if num_cars == 0:
         return 0.0
 
-    car_positions = np.random.choice(road_length, num_cars, replace=False)
-    road[car_positions] = np.random.randint(0, V_MAX + 1, num_cars)
+    road = cache_estados.estado_inicial(road_length, density, V_MAX, P_SLOWDOWN, seed)
     
     # O array 'next_road' também é compartilhado
     next_road = np.full(road_length, -1)
 
-    # 2. Configuração das Threads e Barreiras
+    # 2. Configuração das Threads e da Barreira
     threads = []
     
-    # Barreiras para 'num_threads' threads
-    barrier_calc = threading.Barrier(num_threads)
-    barrier_copy = threading.Barrier(num_threads)
+    # Modo adaptativo: cada thread grava a soma das velocidades do seu pedaço
+    # em 'somas'. A ação da barreira de cálculo roda em uma única thread, com
+    # todas as outras paradas, então a decisão em 'parar' é a mesma para todas
+    somas = [0] * num_threads
+    parar = [False]
+    erros = []
+
+    def avaliar_passo():
+        soma_v = sum(somas)
+        if monitor.adicionar(soma_v / road_length, soma_v / num_cars):
+            parar[0] = True
+
+    # Barreira para 'num_threads' threads
+    barrier_calc = threading.Barrier(num_threads, action=avaliar_passo if monitor is not None else None)
+
+    # Buffers rotativos (o terceiro é limpo um passo antes)
+    buffers = [road, next_road, np.full(road_length, -1)]
 
     # 3. Criar as threads
     for i in range(num_threads):
         # O 'target' é a função que a thread vai rodar
         # 'args' são os argumentos passados para essa função
         t = threading.Thread(
-            target=worker_thread, 
-            args=(i, num_threads, road_length, sim_steps, road, next_road, barrier_calc, barrier_copy)
+            target=worker_thread,
+            args=(i, num_threads, road_length, sim_steps, buffers, barrier_calc, somas, parar, passo, erros)
         )
         threads.append(t)
 
@@ -135,11 +139,16 @@ def run_simulation_parallel(road_length, density, sim_steps, num_threads):
     # Para a medição do tempo
     end_time = time.perf_counter()
 
+    # Erro em alguma thread: levanta o original (as outras só viram a barreira quebrada)
+    if erros:
+        raise next((e for e in erros if not isinstance(e, threading.BrokenBarrierError)), erros[0])
+
     return end_time - start_time
 
 def run_experiments_parallel():
     """
-    Roda a bateria de testes paralelos e salva os resultados em um CSV.
+    Roda a bateria de testes paralelos e acrescenta cada execução ao
+    armazenamento de resultados (nasch.resultados).
     """
     print("Iniciando bateria de testes paralelos (Threads)...")
     
@@ -148,69 +157,57 @@ def run_experiments_parallel():
     densidades = [0.1, 0.3, 0.5]
     passos_simulacao = 200
     
+    # Modo adaptativo: cada execução para quando o fluxo converge
+    # (o limite de passos passa a ser passos_maximos)
+    adaptativo = False
+    erro_alvo = 0.01
+    passos_maximos = PASSOS_MAXIMOS
+    
+    limite = passos_maximos if adaptativo else passos_simulacao
+    
     # Vamos testar com diferentes números de threads
+    # ("auto" deixa o modelo de custo de nasch.autotune escolher)
     lista_num_threads = [2, 4, 8] 
     
     # --- Execução ---
     
-    resultados = []
-    
-    for num_t in lista_num_threads:
+    for opcao_t in lista_num_threads:
         for comp in comprimentos_estrada:
             for dens in densidades:
                 
+                num_t = opcao_t
+                if opcao_t == "auto":
+                    num_t = autotune.escolher_paralelismo("threads", comp, dens, limite)
+                
                 print(f"  Testando: Threads={num_t}, Comp={comp}, Dens={dens}...")
                 
                 # Executa a simulação
-                tempo = run_simulation_parallel(comp, dens, passos_simulacao, num_t)
+                monitor = MonitorConvergencia(erro_alvo) if adaptativo else None
+                tempo = run_simulation_parallel(comp, dens, limite, num_t, monitor=monitor)
+                passos = monitor.passos if monitor else limite
                 
                 print(f"    -> Tempo: {tempo:.4f} segundos")
                 
-                # Armazena os resultados
-                resultados.append([
-                    f"Paralelo ({num_t} threads)",
-                    comp,
-                    dens,
-                    passos_simulacao,
-                    V_MAX,
-                    P_SLOWDOWN,
-                    num_t,
-                    tempo
-                ])
-
-    # --- Salvando os resultados em CSV ---
-    
-    output_dir = "arquivos"
-    output_file = os.path.join(output_dir, "resultados_paralelo.csv")
-    
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        
-    print(f"\nSalvando resultados em '{output_file}'...")
-    
-    try:
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # Cabeçalho
-            writer.writerow([
-                "Tipo_Execucao",
-                "Comprimento_Estrada", 
-                "Densidade", 
-                "Passos_Simulacao",
-                "V_Max",
-                "P_Slowdown",
-                "Num_Threads",
-                "Tempo_s"
-            ])
-            
-            # Dados
-            writer.writerows(resultados)
-            
-        print("Resultados salvos com sucesso.")
-        
-    except IOError as e:
-        print(f"Erro ao salvar arquivo: {e}")
+                # Acrescenta a execução ao armazenamento (um segmento por execução)
+                linha = {
+                    'backend': "threads",
+                    'comprimento': comp,
+                    'densidade': dens,
+                    'passos': passos,
+                    'v_max': V_MAX,
+                    'p_slowdown': P_SLOWDOWN,
+                    'workers': num_t,
+                    'kernel': KERNEL,
+                    'seed': 0,
+                    'tempo_s': tempo,
+                }
+                if monitor:
+                    print(f"    -> Passos: {passos} (erro relativo: {monitor.erro_relativo:.2%})")
+                    linha.update(monitor.colunas(limite))
+                resultados.anexar([linha])
+
+    print(f"\nResultados salvos em '{resultados.DIRETORIO_RESULTADOS}'.")
+    print("Use 'python -m nasch.analise tabela' para ver speedup e eficiência.")
 
 # --- Ponto de Entrada Principal ---
 if __name__ == "__main__":
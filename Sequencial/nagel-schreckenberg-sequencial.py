@@ -2,91 +2,68 @@
 
 import time
 import os
-import csv
 import numpy as np
-import random
+import sys
+
+# Raiz do repositório no path, para importar o pacote compartilhado 'nasch'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nasch import cache_estados, resultados
+from nasch.convergencia import MonitorConvergencia, PASSOS_MAXIMOS
+from nasch.regras import Estado, obter_kernel
 
 # --- Parâmetros da Simulação ---
 V_MAX = 5        # Velocidade máxima (células / passo)
 P_SLOWDOWN = 0.3 # Probabilidade de desaceleração aleatória
+KERNEL = "referencia"  # Kernel das regras (ver nasch.regras.KERNELS)
 
-def run_simulation(road_length, density, sim_steps):
+def run_simulation(road_length, density, sim_steps, seed=0, monitor=None, kernel=KERNEL):
     """
     Executa uma única simulação sequencial do modelo NaSch.
 
+    'kernel' escolhe a implementação das regras em nasch.regras; o padrão é o
+    laço célula a célula, a linha de base do speedup.
+
+    O estado inicial (já equilibrado) vem do cache de nasch.cache_estados;
+    'seed' escolhe qual estado usar.
+
+    Com um 'monitor' (nasch.convergencia.MonitorConvergencia), a simulação
+    para assim que o fluxo converge; 'sim_steps' vira o limite de passos.
+
     Retorna: O tempo (em segundos) que a simulação levou.
     """
     
     # 1. Inicialização da Estrada
     # -1 representa uma célula vazia.
     # >= 0 representa um carro com aquela velocidade.
-    road = np.full(road_length, -1)
-    
-    # Preenche a estrada com carros
     num_cars = int(road_length * density)
     if num_cars == 0:
         return 0.0 # Evita divisão por zero se a densidade for muito baixa
 
-    # Escolhe posições aleatórias únicas para os carros
-    car_positions = np.random.choice(road_length, num_cars, replace=False)
-    
-    # Atribui velocidades iniciais aleatórias (0 a V_MAX)
-    road[car_positions] = np.random.randint(0, V_MAX + 1, num_cars)
+    # Carrega o estado aquecido do cache (calcula e guarda se faltar)
+    road = cache_estados.estado_inicial(road_length, density, V_MAX, P_SLOWDOWN, seed)
+
+    # Dois buffers: lê de 'road' e escreve em 'next_road', que é limpo a cada
+    # passo; é essencial não atualizar o estado "ao vivo"
+    estado = Estado(road, np.full(road_length, -1), V_MAX, P_SLOWDOWN)
+    passo = obter_kernel(kernel)
+    rng = np.random.default_rng()
 
     # Inicia a medição do tempo (APENAS o loop de simulação)
     start_time = time.perf_counter()
 
     # 2. Loop Principal da Simulação
     for _ in range(sim_steps):
-        
-        # Cria o array para o próximo estado da estrada
-        # É essencial usar um buffer para não atualizar o estado "ao vivo"
-        next_road = np.full(road_length, -1)
-        
-        # Itera por cada célula da estrada
-        for i in range(road_length):
-            
-            # Se a célula NÃO tiver um carro, pule
-            if road[i] == -1:
-                continue
 
-            # --- É um carro. Aplicar as 4 regras do NaSch ---
-            
-            v_atual = road[i]
-            
-            # Regra 0: Encontrar a distância (d) para o próximo carro
-            # (Fazemos isso primeiro para aplicar as regras 1 e 2)
-            distancia = 1
-            # Procura na próxima célula em diante, com 'wrap-around' (estrada circular)
-            while road[(i + distancia) % road_length] == -1:
-                distancia += 1
-                
-                # Otimização: Se a distância for maior que V_MAX + 1,
-                # não precisamos procurar mais, pois v_nova nunca passará de V_MAX.
-                if distancia > V_MAX + 1:
-                    break
-            
-            # --- Aplicação das Regras ---
-            
-            # Regra 1: Aceleração
-            v_nova = min(v_atual + 1, V_MAX)
-            
-            # Regra 2: Desaceleração (Evitar Colisão)
-            # A velocidade não pode ser maior que o espaço livre à frente (distancia - 1)
-            v_nova = min(v_nova, distancia - 1)
-            
-            # Regra 3: Aleatorização (Comportamento Humano)
-            if v_nova > 0 and random.random() < P_SLOWDOWN:
-                v_nova = v_nova - 1
-                
-            # Regra 4: Movimento
-            # Coloca o carro (com sua v_nova) na nova posição no array 'next_road'
-            nova_posicao = (i + v_nova) % road_length
-            next_road[nova_posicao] = v_nova
-
-        # Atualiza a estrada 'atual' com o 'próximo' estado
-        # O loop for recomeça com a estrada atualizada
-        road = next_road
+        # Aplica as 4 regras do NaSch à estrada inteira
+        estado.next_road[:] = -1
+        soma_v = passo(estado, rng, (0, road_length))
+
+        # A estrada 'atual' passa a ser a 'próxima' (troca por referência)
+        estado.road, estado.next_road = estado.next_road, estado.road
+
+        # Modo adaptativo: para quando fluxo e velocidade média convergirem
+        if monitor is not None and monitor.adicionar(soma_v / road_length, soma_v / num_cars):
+            break
 
     # Para a medição do tempo
     end_time = time.perf_counter()
@@ -95,7 +72,8 @@ def run_simulation(road_length, density, sim_steps):
 
 def run_experiments():
     """
-    Roda a bateria de testes e salva os resultados em um CSV.
+    Roda a bateria de testes e acrescenta cada execução ao armazenamento de
+    resultados (nasch.resultados).
     """
     print("Iniciando bateria de testes sequenciais...")
     
@@ -111,9 +89,15 @@ def run_experiments():
     # Número de passos de tempo (iterações) para simular
     passos_simulacao = 200
     
-    # --- Execução ---
+    # Modo adaptativo: cada execução para quando o fluxo converge
+    # (o limite de passos passa a ser passos_maximos)
+    adaptativo = False
+    erro_alvo = 0.01
+    passos_maximos = PASSOS_MAXIMOS
     
-    resultados = []
+    limite = passos_maximos if adaptativo else passos_simulacao
+    
+    # --- Execução ---
     
     for comp in comprimentos_estrada:
         for dens in densidades:
@@ -121,55 +105,32 @@ def run_experiments():
             print(f"  Testando: Comprimento={comp}, Densidade={dens}...")
             
             # Executa a simulação
-            tempo = run_simulation(comp, dens, passos_simulacao)
+            monitor = MonitorConvergencia(erro_alvo) if adaptativo else None
+            tempo = run_simulation(comp, dens, limite, monitor=monitor)
+            passos = monitor.passos if monitor else limite
             
             print(f"    -> Tempo: {tempo:.4f} segundos")
             
-            # Armazena os resultados
-            resultados.append([
-                "Sequencial",
-                comp,
-                dens,
-                passos_simulacao,
-                V_MAX,
-                P_SLOWDOWN,
-                tempo
-            ])
-
-    # --- Salvando os resultados em CSV ---
-    
-    output_dir = "arquivos"
-    output_file = os.path.join(output_dir, "resultados_sequencial.csv")
-    
-    # Cria o diretório 'arquivos' se ele não existir
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        
-    print(f"\nSalvando resultados em '{output_file}'...")
-    
-    # Escreve o cabeçalho e as linhas de dados
-    try:
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # Cabeçalho
-            writer.writerow([
-                "Tipo_Execucao",
-                "Comprimento_Estrada", 
-                "Densidade", 
-                "Passos_Simulacao",
-                "V_Max",
-                "P_Slowdown",
-                "Tempo_s"
-            ])
-            
-            # Dados
-            writer.writerows(resultados)
-            
-        print("Resultados salvos com sucesso.")
-        
-    except IOError as e:
-        print(f"Erro ao salvar arquivo: {e}")
+            # Acrescenta a execução ao armazenamento (um segmento por execução)
+            linha = {
+                'backend': "sequencial",
+                'comprimento': comp,
+                'densidade': dens,
+                'passos': passos,
+                'v_max': V_MAX,
+                'p_slowdown': P_SLOWDOWN,
+                'workers': 1,
+                'kernel': KERNEL,
+                'seed': 0,
+                'tempo_s': tempo,
+            }
+            if monitor:
+                print(f"    -> Passos: {passos} (erro relativo: {monitor.erro_relativo:.2%})")
+                linha.update(monitor.colunas(limite))
+            resultados.anexar([linha])
+
+    print(f"\nResultados salvos em '{resultados.DIRETORIO_RESULTADOS}'.")
+    print("Use 'python -m nasch.analise tabela' para ver speedup e eficiência.")
 
 # --- Ponto de Entrada Principal ---
 if __name__ == "__main__":
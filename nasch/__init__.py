@@ -0,0 +1,19 @@
+"""
+Pacote compartilhado pelas versões da simulação NaSch.
+
+Reúne as regras do modelo (kernels intercambiáveis usados por todos os
+backends), o backend de processos e o que não pertence a um backend
+específico (sequencial, threads, processos ou sockets):
+
+    regras         kernels das regras do NaSch e o estado de um passo
+    processos      backend com multiprocessing e memória compartilhada
+    backends       acesso uniforme aos quatro backends
+    autotune       escolha automática do backend e do número de workers
+    cache_estados  estados iniciais já equilibrados, em cache no disco
+    convergencia   critério de parada adaptativo (médias de lotes)
+    experimentos   bateria de testes em qualquer backend
+    resultados     armazenamento colunar dos resultados
+    analise        tabelas e gráficos incrementais a partir dos resultados
+    telemetria     telemetria ao vivo do Mestre distribuído
+    conferencia    conferência dos backends contra o sequencial
+"""
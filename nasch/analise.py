@@ -0,0 +1,266 @@
+"""
+Análise incremental dos resultados (substitui o notebook de análise).
+
+Mantém em arquivos/resultados/analise_estado.json as somas por grupo
+(backend, kernel, comprimento, densidade, workers) e a lista de segmentos já
+lidos.
+Cada execução lê apenas os segmentos novos do armazenamento e atualiza as
+somas; as tabelas de tempo, speedup e eficiência e os gráficos saem dessas
+somas, sem reler o histórico.
+
+O speedup é calculado pelo tempo médio POR PASSO, para que execuções com
+números de passos diferentes sejam comparáveis:
+
+    speedup    = (tempo/passo do sequencial) / (tempo/passo do backend)
+    eficiência = speedup / workers
+
+A referência é o sequencial com o MESMO kernel, para que o speedup meça só o
+ganho do paralelismo. Sem essa execução, usa-se o sequencial com o kernel de
+referência (laço célula a célula) e a coluna 'base' mostra isso: o speedup
+passa a somar o ganho do kernel ao do paralelismo.
+
+Uso:
+    python -m nasch.analise tabela
+    python -m nasch.analise graficos
+    python -m nasch.analise importar-csv Sequencial/arquivos/resultados_sequencial.csv ...
+"""
+
+import argparse
+import csv
+import json
+import os
+
+import numpy as np
+
+from nasch import resultados
+
+ARQUIVO_ESTADO = "analise_estado.json"
+
+# Muda quando o formato das chaves muda; um estado de outra versão é refeito
+VERSAO_ESTADO = 3
+
+
+def _chave(backend, kernel, comprimento, densidade, workers):
+    return f"{backend}|{kernel}|{int(comprimento)}|{float(densidade):g}|{int(workers)}"
+
+
+def _carregar_estado(diretorio):
+    caminho = os.path.join(diretorio, ARQUIVO_ESTADO)
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as f:
+            estado = json.load(f)
+        if estado.get('versao') == VERSAO_ESTADO:
+            return estado
+    return {'versao': VERSAO_ESTADO, 'lidos': [], 'grupos': {}}
+
+
+def _salvar_estado(estado, diretorio):
+    caminho = os.path.join(diretorio, ARQUIVO_ESTADO)
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(estado, f)
+    os.replace(temporario, caminho)
+
+
+def atualizar(diretorio=resultados.DIRETORIO_RESULTADOS):
+    """Incorpora às somas os segmentos ainda não lidos e retorna o estado."""
+    estado = _carregar_estado(diretorio)
+    lidos = set(estado['lidos'])
+    novos = [n for n in resultados.listar_segmentos(diretorio) if n not in lidos]
+
+    for nome in novos:
+        seg = resultados.ler_segmento(nome, diretorio)
+        for i in range(len(seg['tempo_s'])):
+            # Antes da coluna 'kernel', o sequencial sempre usou o de referência;
+            # linhas importadas dos CSVs antigos (seed -1) formam o grupo 'legado'
+            kernel = seg['kernel'][i] or ('referencia' if seg['backend'][i] == 'sequencial' else '-')
+            if seg['seed'][i] == -1:
+                kernel = 'legado'
+            chave = _chave(seg['backend'][i], kernel, seg['comprimento'][i],
+                           seg['densidade'][i], seg['workers'][i])
+            grupo = estado['grupos'].setdefault(
+                chave, {'n': 0, 'soma_tempo_s': 0.0, 'soma_tempo_passo_s': 0.0}
+            )
+            grupo['n'] += 1
+            grupo['soma_tempo_s'] += float(seg['tempo_s'][i])
+            grupo['soma_tempo_passo_s'] += float(seg['tempo_s'][i]) / int(seg['passos'][i])
+        estado['lidos'].append(nome)
+
+    if novos:
+        _salvar_estado(estado, diretorio)
+    return estado
+
+
+def tabela(estado):
+    """
+    Linhas de análise a partir das somas.
+
+    Retorna uma lista de dicts com backend, kernel, comprimento, densidade,
+    workers, n, tempo médio, tempo médio por passo, speedup, eficiência e
+    'base' (o kernel do sequencial usado como referência; '-' se não houver).
+    """
+    linhas = []
+    for chave, grupo in estado['grupos'].items():
+        backend, kernel, comprimento, densidade, workers = chave.split("|")
+        linhas.append({
+            'backend': backend,
+            'kernel': kernel,
+            'comprimento': int(comprimento),
+            'densidade': float(densidade),
+            'workers': int(workers),
+            'n': grupo['n'],
+            'tempo_s': grupo['soma_tempo_s'] / grupo['n'],
+            'tempo_passo_s': grupo['soma_tempo_passo_s'] / grupo['n'],
+        })
+
+    # Linha de base: sequencial com o mesmo kernel, estrada e densidade
+    # (na falta dele, o sequencial com o kernel de referência)
+    base = {(l['kernel'], l['comprimento'], l['densidade']): l['tempo_passo_s']
+            for l in linhas if l['backend'] == 'sequencial'}
+    for l in linhas:
+        l['base'] = l['kernel']
+        ref = base.get((l['kernel'], l['comprimento'], l['densidade']))
+        if not ref:
+            ref = base.get(('referencia', l['comprimento'], l['densidade']))
+            l['base'] = 'referencia' if ref else '-'
+        l['speedup'] = ref / l['tempo_passo_s'] if ref else np.nan
+        l['eficiencia'] = l['speedup'] / l['workers']
+
+    linhas.sort(key=lambda l: (l['comprimento'], l['densidade'], l['backend'], l['kernel'], l['workers']))
+    return linhas
+
+
+def imprimir_tabela(linhas):
+    print("=== Tabela Comparativa (médias) ===")
+    print(f"{'Comp':>7} {'Dens':>5} {'Backend':<11} {'Kernel':<11} {'Workers':>7} {'N':>4} "
+          f"{'Tempo_s':>10} {'ms/passo':>9} {'Speedup':>8} {'Eficiência':>10} {'Base':<11}")
+    for l in linhas:
+        # '*' marca speedup contra outro kernel (inclui o ganho do kernel)
+        outra_base = l['base'] not in (l['kernel'], '-')
+        print(f"{l['comprimento']:>7} {l['densidade']:>5g} {l['backend']:<11} {l['kernel']:<11} "
+              f"{l['workers']:>7} "
+              f"{l['n']:>4} {l['tempo_s']:>10.4f} {l['tempo_passo_s']*1e3:>9.3f} "
+              f"{l['speedup']:>8.2f} {l['eficiencia']:>10.2f} {l['base'] + ('*' if outra_base else ''):<11}")
+    if any(l['base'] not in (l['kernel'], '-') for l in linhas):
+        print("* Sem sequencial com o mesmo kernel: speedup contra o sequencial de referência "
+              "(soma o ganho do kernel ao do paralelismo).")
+
+
+def graficos(linhas, saida):
+    """Gera os gráficos de tempo, speedup e eficiência (requer matplotlib)."""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("Biblioteca 'matplotlib' não encontrada. Instale com: pip install matplotlib")
+        return []
+
+    os.makedirs(saida, exist_ok=True)
+    series = sorted({(l['backend'], l['kernel'], l['workers']) for l in linhas})
+    arquivos = []
+
+    # Tempo por passo x tamanho da estrada (média entre densidades)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for backend, kernel, workers in series:
+        pontos = {}
+        for l in linhas:
+            if (l['backend'], l['kernel'], l['workers']) == (backend, kernel, workers):
+                pontos.setdefault(l['comprimento'], []).append(l['tempo_passo_s'])
+        xs = sorted(pontos)
+        ax.plot(xs, [np.mean(pontos[x]) for x in xs], marker='o',
+                label=f"{backend}/{kernel} ({workers})")
+    ax.set_title('Comparação de Tempos por Passo (Menor é Melhor)')
+    ax.set_xlabel('Tamanho da Estrada (Células)')
+    ax.set_ylabel('Tempo por passo (segundos)')
+    ax.set_yscale('log')
+    ax.legend()
+    arquivos.append(os.path.join(saida, "tempo.png"))
+    fig.savefig(arquivos[-1])
+    plt.close(fig)
+
+    # Speedup e eficiência x workers (média entre tamanhos e densidades)
+    for campo, titulo, ideal in (
+        ('speedup', 'Speedup em relação ao Sequencial (Maior é Melhor)', None),
+        ('eficiencia', 'Eficiência: Uso dos Recursos (Ideal é próximo de 1.0)', 1.0),
+    ):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        for backend, kernel in sorted({(b, k) for b, k, _ in series if b != 'sequencial'}):
+            pontos = {}
+            for l in linhas:
+                if (l['backend'], l['kernel']) == (backend, kernel) and not np.isnan(l[campo]):
+                    pontos.setdefault(l['workers'], []).append(l[campo])
+            xs = sorted(pontos)
+            ax.plot(xs, [np.mean(pontos[x]) for x in xs], marker='o', label=f"{backend}/{kernel}")
+        ax.axhline(1, color='red', linestyle='--',
+                   label='Ideal (1.0)' if ideal else 'Baseline Sequencial (1.0)')
+        ax.set_title(titulo)
+        ax.set_xlabel('Número de Trabalhadores')
+        ax.legend()
+        arquivos.append(os.path.join(saida, f"{campo}.png"))
+        fig.savefig(arquivos[-1])
+        plt.close(fig)
+
+    return arquivos
+
+
+# Prefixo de Tipo_Execucao nos CSVs antigos -> backend
+_BACKEND_CSV = {'Sequencial': 'sequencial', 'Paralelo': 'threads', 'Distribuido': 'sockets'}
+
+
+def importar_csv(caminhos, diretorio=resultados.DIRETORIO_RESULTADOS):
+    """Converte os CSVs antigos (um por backend) para o armazenamento colunar."""
+    for caminho in caminhos:
+        linhas = []
+        with open(caminho, newline='', encoding='utf-8') as f:
+            for reg in csv.DictReader(f):
+                backend = _BACKEND_CSV[reg['Tipo_Execucao'].split()[0]]
+                workers = reg.get('Num_Threads') or reg.get('Num_Workers') or 1
+                linhas.append({
+                    'backend': backend,
+                    'comprimento': int(reg['Comprimento_Estrada']),
+                    'densidade': float(reg['Densidade']),
+                    'passos': int(reg['Passos_Simulacao']),
+                    'v_max': int(reg['V_Max']),
+                    'p_slowdown': float(reg['P_Slowdown']),
+                    'workers': int(workers),
+                    # Versões antigas (estado inicial aleatório, protocolo de
+                    # sockets anterior): grupo próprio, sem misturar com as novas
+                    'kernel': 'legado',
+                    'seed': -1,  # Execuções antigas: estado inicial aleatório
+                    'tempo_s': float(reg['Tempo_s']),
+                })
+        resultados.anexar(linhas, diretorio)
+        print(f"{len(linhas)} linhas importadas de '{caminho}'.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análise dos resultados (speedup e eficiência).")
+    parser.add_argument("--dados", default=resultados.DIRETORIO_RESULTADOS,
+                        help="Pasta do armazenamento de resultados.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    sub.add_parser("tabela", help="Atualiza e mostra a tabela comparativa.")
+
+    graf = sub.add_parser("graficos", help="Atualiza e gera os gráficos em PNG.")
+    graf.add_argument("--saida", default=os.path.join("arquivos", "graficos"))
+
+    imp = sub.add_parser("importar-csv", help="Importa CSVs no formato antigo.")
+    imp.add_argument("csvs", nargs="+")
+
+    args = parser.parse_args()
+
+    if args.comando == "importar-csv":
+        importar_csv(args.csvs, args.dados)
+        return
+
+    linhas = tabela(atualizar(args.dados))
+    if args.comando == "tabela":
+        imprimir_tabela(linhas)
+    else:
+        for arquivo in graficos(linhas, args.saida):
+            print(f"Gráfico salvo em '{arquivo}'.")
+
+
+if __name__ == "__main__":
+    main()
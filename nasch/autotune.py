@@ -0,0 +1,239 @@
+"""
+Escolha automática de backend e número de workers por modelo de custo.
+
+Os resultados mostram que a melhor opção depende do tamanho da estrada e da
+densidade: com 1000 células o sequencial vence, e threads/sockets só compensam
+em estradas grandes. Aqui medimos execuções curtas (sondas) de cada backend e
+ajustamos, por mínimos quadrados não negativos, o tempo por passo:
+
+    t_passo = c_inicio / passos        (custo fixo de preparar a execução)
+            + c_carro  * carros / p    (cálculo por carro, dividido entre workers)
+            + c_celula * células / p   (varredura por célula)
+            + c_sync   * p             (sincronização e troca de bordas por passo)
+
+Não há termo separado por byte transferido: no backend de sockets cada worker
+troca por passo um halo de tamanho fixo e listas de carros migrantes com
+poucos elementos, e o tráfego medido fica em ~490 bytes por worker e por passo
+em qualquer densidade. Esse termo seria proporcional a p e não poderia ser
+separado de c_sync; o custo da transferência fica embutido em c_sync.
+
+O modelo é salvo em JSON e usado para escolher (backend, p) de qualquer
+pedido (comprimento, densidade, passos).
+
+Uso:
+    python -m nasch.autotune calibrar
+    python -m nasch.autotune escolher 20000 0.3 200
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from nasch import backends
+
+ARQUIVO_MODELO = os.path.join(backends.RAIZ, "arquivos", "modelo_custo.json")
+
+TERMOS = ["inicio", "carro", "celula", "sync"]
+
+# Configurações das sondas de calibração (curtas de propósito)
+SONDA_COMPRIMENTOS = [1000, 8000]
+SONDA_DENSIDADES = [0.1, 0.4]
+SONDA_PASSOS = [10, 40]
+SONDA_PARALELISMO = {
+    'sequencial': [1],
+    'threads': [1, 2, 4],
+    'processos': [2, 4],
+    'sockets': [2, 4],
+}
+
+# Valores de paralelismo considerados na escolha
+CANDIDATOS_PARALELISMO = {
+    'sequencial': [1],
+    'threads': [1, 2, 4, 8],
+    'processos': [1, 2, 4, 8],
+    'sockets': [2, 4, 8],
+}
+
+def caracteristicas(backend, road_length, density, sim_steps, paralelismo):
+    """Vetor de termos do modelo (mesma ordem de TERMOS)."""
+    carros = int(road_length * density)
+    return np.array([
+        1.0 / sim_steps,
+        carros / paralelismo,
+        road_length / paralelismo,
+        float(paralelismo),
+    ])
+
+
+def _minimos_quadrados_nao_negativos(A, y):
+    """Mínimos quadrados com coeficientes >= 0 (remove termos negativos e refaz)."""
+    ativos = list(range(A.shape[1]))
+    coef = np.zeros(A.shape[1])
+
+    # Normaliza as colunas: os termos têm escalas muito diferentes
+    escala = np.abs(A).max(axis=0)
+    escala[escala == 0] = 1.0
+    An = A / escala
+
+    while ativos:
+        solucao = np.linalg.lstsq(An[:, ativos], y, rcond=None)[0]
+        if (solucao >= 0).all():
+            coef[:] = 0.0
+            coef[ativos] = solucao
+            break
+        del ativos[int(np.argmin(solucao))]
+
+    return coef / escala
+
+
+def calibrar(backends_calibrar=backends.BACKENDS, verbose=True):
+    """Roda as sondas, ajusta um modelo por backend e retorna o dicionário do modelo."""
+    modelo = {
+        'calibrado_em': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'termos': TERMOS,
+        'backends': {},
+    }
+
+    for backend in backends_calibrar:
+        linhas, tempos_por_passo = [], []
+
+        for comp in SONDA_COMPRIMENTOS:
+            for dens in SONDA_DENSIDADES:
+                for passos in SONDA_PASSOS:
+                    for p in SONDA_PARALELISMO[backend]:
+                        if not backends.paralelismo_valido(backend, comp, p):
+                            continue
+
+                        tempo = backends.executar(backend, comp, dens, passos, p)
+                        if verbose:
+                            print(f"  Sonda {backend}: p={p}, Comp={comp}, Dens={dens}, "
+                                  f"Passos={passos} -> {tempo:.4f} s")
+
+                        linhas.append(caracteristicas(backend, comp, dens, passos, p))
+                        tempos_por_passo.append(tempo / passos)
+
+        coef = _minimos_quadrados_nao_negativos(np.array(linhas), np.array(tempos_por_passo))
+        modelo['backends'][backend] = {'coeficientes': coef.tolist()}
+
+    return modelo
+
+
+def salvar_modelo(modelo, caminho=ARQUIVO_MODELO):
+    """Grava o modelo de custo em JSON."""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(modelo, f, indent=2)
+
+
+def carregar_modelo(caminho=ARQUIVO_MODELO, calibrar_se_ausente=True):
+    """
+    Lê o modelo salvo; se não existir (ou tiver outros termos), calibra e salva
+    (quando permitido).
+    """
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as f:
+            modelo = json.load(f)
+        if modelo.get('termos') == TERMOS:
+            return modelo
+        motivo = "desatualizado (termos diferentes)"
+    else:
+        motivo = "não encontrado"
+
+    if not calibrar_se_ausente:
+        raise FileNotFoundError(f"Modelo de custo {motivo} em '{caminho}'.")
+
+    print(f"Modelo de custo {motivo}. Calibrando (execuções curtas)...")
+    modelo = calibrar()
+    salvar_modelo(modelo, caminho)
+    return modelo
+
+
+def prever(modelo, backend, road_length, density, sim_steps, paralelismo):
+    """Tempo total previsto (s) para a execução descrita."""
+    coef = np.array(modelo['backends'][backend]['coeficientes'])
+    x = caracteristicas(backend, road_length, density, sim_steps, paralelismo)
+    return float(coef @ x) * sim_steps
+
+
+def escolher(road_length, density, sim_steps, modelo=None, backends_permitidos=None):
+    """
+    Escolhe o backend e o paralelismo de menor tempo previsto.
+
+    Retorna (backend, paralelismo, tempo_previsto).
+    """
+    if modelo is None:
+        modelo = carregar_modelo()
+    if backends_permitidos is None:
+        backends_permitidos = list(modelo['backends'])
+
+    melhor = None
+    for backend in backends_permitidos:
+        if backend not in modelo['backends']:
+            continue
+        for p in CANDIDATOS_PARALELISMO[backend]:
+            if not backends.paralelismo_valido(backend, road_length, p):
+                continue
+            tempo = prever(modelo, backend, road_length, density, sim_steps, p)
+            if melhor is None or tempo < melhor[2]:
+                melhor = (backend, p, tempo)
+
+    if melhor is None:
+        raise ValueError("Nenhum backend calibrado atende a este pedido.")
+    return melhor
+
+
+def escolher_paralelismo(backend, road_length, density, sim_steps, modelo=None):
+    """Atalho para os scripts de cada backend: só o número de workers/threads."""
+    return escolher(road_length, density, sim_steps, modelo, [backend])[1]
+
+
+def executar_auto(road_length, density, sim_steps, modelo=None, monitor=None):
+    """
+    Executa a simulação no backend escolhido pelo modelo.
+
+    Retorna (tempo, backend, paralelismo).
+    """
+    backend, p, _ = escolher(road_length, density, sim_steps, modelo)
+    tempo = backends.executar(backend, road_length, density, sim_steps, p, monitor=monitor)
+    return tempo, backend, p
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibração e escolha automática de backend.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    cal = sub.add_parser("calibrar", help="Roda as sondas e salva o modelo de custo.")
+    cal.add_argument("--backends", nargs="+", choices=backends.BACKENDS, default=list(backends.BACKENDS))
+    cal.add_argument("--modelo", default=ARQUIVO_MODELO)
+
+    esc = sub.add_parser("escolher", help="Mostra a escolha para um pedido.")
+    esc.add_argument("comprimento", type=int)
+    esc.add_argument("densidade", type=float)
+    esc.add_argument("passos", type=int)
+    esc.add_argument("--modelo", default=ARQUIVO_MODELO)
+
+    args = parser.parse_args()
+
+    if args.comando == "calibrar":
+        modelo = calibrar(args.backends)
+        salvar_modelo(modelo, args.modelo)
+        print(f"Modelo salvo em '{args.modelo}'.")
+        for backend, dados in modelo['backends'].items():
+            termos = ", ".join(f"{t}={c:.3e}" for t, c in zip(TERMOS, dados['coeficientes']))
+            print(f"  {backend}: {termos}")
+    else:
+        modelo = carregar_modelo(args.modelo)
+        backend, p, tempo = escolher(args.comprimento, args.densidade, args.passos, modelo)
+        print(f"Backend: {backend} (paralelismo={p}), tempo previsto: {tempo:.4f} s")
+        for b in modelo['backends']:
+            for q in CANDIDATOS_PARALELISMO[b]:
+                if backends.paralelismo_valido(b, args.comprimento, q):
+                    t = prever(modelo, b, args.comprimento, args.densidade, args.passos, q)
+                    print(f"  {b:<10} p={q:<2} -> {t:.4f} s")
+
+
+if __name__ == "__main__":
+    main()
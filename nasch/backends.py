@@ -0,0 +1,125 @@
+"""
+Acesso uniforme aos backends da simulação.
+
+Os scripts de cada versão ficam em pastas próprias (e alguns têm hífen no
+nome), então são carregados pelo caminho do arquivo. O backend de processos
+fica no próprio pacote (nasch.processos), para que os processos filhos possam
+importá-lo. O backend de sockets é executado com workers locais, iniciados
+como subprocessos.
+
+Todo backend aceita qualquer kernel de nasch.regras (parâmetro 'kernel'); sem
+ele, cada backend usa o seu padrão (constante KERNEL do módulo).
+"""
+
+import importlib
+import importlib.util
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Backend -> script que o implementa
+SCRIPTS = {
+    'sequencial': os.path.join(RAIZ, 'Sequencial', 'nagel-schreckenberg-sequencial.py'),
+    'threads': os.path.join(RAIZ, 'Paralelo', 'nagel-schreckenberg-Paralelo.py'),
+    'sockets': os.path.join(RAIZ, 'Distribuido', 'servidor_mestre.py'),
+}
+
+# Backends implementados dentro do pacote
+MODULOS = {
+    'processos': 'nasch.processos',
+}
+
+BACKENDS = ('sequencial', 'threads', 'processos', 'sockets')
+
+_modulos = {}
+
+def carregar_script(backend):
+    """Importa (uma única vez) o script do backend e retorna o módulo."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {backend!r}. Opções: {', '.join(BACKENDS)}")
+
+    if backend in MODULOS:
+        return importlib.import_module(MODULOS[backend])
+
+    if backend not in _modulos:
+        caminho = SCRIPTS[backend]
+
+        # Os scripts importam módulos irmãos (ex.: 'comunicacao')
+        pasta = os.path.dirname(caminho)
+        if pasta not in sys.path:
+            sys.path.insert(0, pasta)
+
+        spec = importlib.util.spec_from_file_location(f"nasch_backend_{backend}", caminho)
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        _modulos[backend] = modulo
+
+    return _modulos[backend]
+
+
+def paralelismo_valido(backend, road_length, paralelismo):
+    """Diz se o backend aceita 'paralelismo' workers para esta estrada."""
+    if backend == 'sequencial':
+        return paralelismo == 1
+    if backend == 'sockets':
+        # Cada segmento precisa comportar o halo de V_MAX + 1 células
+        return paralelismo >= 1 and road_length // paralelismo >= carregar_script('sockets').V_MAX + 1
+    return 1 <= paralelismo <= road_length
+
+
+def iniciar_workers_locais(num_workers):
+    """Inicia 'num_workers' processos worker.py nesta máquina e retorna os Popen."""
+    pasta = os.path.dirname(SCRIPTS['sockets'])
+    return [
+        subprocess.Popen(
+            [sys.executable, 'worker.py'], cwd=pasta,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        for _ in range(num_workers)
+    ]
+
+
+def kernel_padrao(backend):
+    """Kernel usado pelo backend quando nenhum é pedido."""
+    return carregar_script(backend).KERNEL
+
+
+def executar(backend, road_length, density, sim_steps, paralelismo=1, seed=0, monitor=None, kernel=None):
+    """
+    Executa uma simulação no backend pedido e retorna o tempo (s).
+
+    'monitor' (nasch.convergencia.MonitorConvergencia) ativa a parada adaptativa.
+    'kernel' é um nome de nasch.regras.KERNELS (None = padrão do backend).
+    """
+    modulo = carregar_script(backend)
+    if kernel is None:
+        kernel = modulo.KERNEL
+
+    if backend == 'sequencial':
+        return modulo.run_simulation(road_length, density, sim_steps, seed=seed, monitor=monitor,
+                                     kernel=kernel)
+
+    if backend == 'threads':
+        return modulo.run_simulation_parallel(road_length, density, sim_steps, paralelismo, seed=seed,
+                                              monitor=monitor, kernel=kernel)
+
+    if backend == 'processos':
+        return modulo.run_simulation_processes(road_length, density, sim_steps, paralelismo, seed=seed,
+                                               monitor=monitor, kernel=kernel)
+
+    # Sockets: os workers são iniciados assim que o mestre começa a escutar
+    processos = []
+    try:
+        return modulo.run_simulation_distributed(
+            road_length, density, sim_steps, paralelismo,
+            ao_escutar=lambda: processos.extend(iniciar_workers_locais(paralelismo)),
+            seed=seed, monitor_convergencia=monitor, kernel=kernel
+        )
+    finally:
+        for p in processos:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
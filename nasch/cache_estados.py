@@ -0,0 +1,112 @@
+"""
+Cache em disco de estados iniciais já equilibrados.
+
+Partir de carros em posições aleatórias exige descartar um transiente longo
+até o sistema chegar ao regime estacionário. Aqui o aquecimento é feito uma
+única vez por (comprimento, densidade, v_max, p_slowdown, seed, passos de
+aquecimento) e o estado resultante é guardado em disco. As próximas execuções,
+de qualquer backend, carregam o estado pronto.
+
+O cache tem tamanho limitado: quando passa do limite, os estados usados há
+mais tempo são removidos (LRU, pela data de modificação, atualizada a cada
+acerto).
+"""
+
+import os
+
+import numpy as np
+
+from nasch.backends import RAIZ
+from nasch.regras import Estado, passo_vetorizado
+
+DIRETORIO_CACHE = os.path.join(RAIZ, "arquivos", "cache_estados")
+LIMITE_BYTES = 256 * 1024 * 1024  # 256 MiB
+PASSOS_AQUECIMENTO = 1000
+
+
+def _nome_arquivo(road_length, density, v_max, p_slowdown, seed, passos_aquecimento):
+    """Nome do arquivo que guarda o estado desta chave."""
+    return (f"L{road_length}_d{density:g}_v{v_max}_p{p_slowdown:g}"
+            f"_s{seed}_a{passos_aquecimento}.npy")
+
+
+def gerar_estado(road_length, density, v_max, p_slowdown, seed, passos_aquecimento):
+    """Sorteia um estado inicial (reprodutível pela seed) e o aquece."""
+    rng = np.random.default_rng(seed)
+
+    # -1 = célula vazia; >= 0 = carro com aquela velocidade
+    road = np.full(road_length, -1)
+    num_cars = int(road_length * density)
+    car_positions = rng.choice(road_length, num_cars, replace=False)
+    road[car_positions] = rng.integers(0, v_max + 1, num_cars)
+
+    # Aquecimento: descarta o transiente com o kernel vetorizado
+    estado = Estado(road, np.full(road_length, -1), v_max, p_slowdown)
+    for _ in range(passos_aquecimento):
+        estado.next_road[:] = -1
+        passo_vetorizado(estado, rng, (0, road_length))
+        estado.road, estado.next_road = estado.next_road, estado.road
+
+    return estado.road
+
+
+def _aplicar_limite(diretorio, limite_bytes, preservar):
+    """Remove os estados menos usados até o cache caber no limite."""
+    arquivos = []
+    for nome in os.listdir(diretorio):
+        if not nome.endswith(".npy"):
+            continue
+        caminho = os.path.join(diretorio, nome)
+        try:
+            info = os.stat(caminho)
+        except FileNotFoundError:
+            continue  # Removido por outro processo
+        arquivos.append((info.st_mtime, info.st_size, caminho))
+
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+
+    # Do uso mais antigo para o mais recente
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= limite_bytes:
+            break
+        if caminho == preservar:
+            continue
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+        total -= tamanho
+
+
+def estado_inicial(road_length, density, v_max, p_slowdown, seed=0,
+                   passos_aquecimento=PASSOS_AQUECIMENTO,
+                   diretorio=DIRETORIO_CACHE, limite_bytes=LIMITE_BYTES):
+    """
+    Retorna um estado equilibrado da estrada, do cache ou recém-calculado.
+
+    Em caso de falta, o estado é gerado, aquecido e gravado no cache.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(
+        diretorio,
+        _nome_arquivo(road_length, density, v_max, p_slowdown, seed, passos_aquecimento)
+    )
+
+    try:
+        road = np.load(caminho)
+        os.utime(caminho)  # Marca como usado recentemente (LRU)
+        return road
+    except (FileNotFoundError, ValueError, EOFError):
+        pass  # Falta (ou arquivo incompleto): recalcula
+
+    road = gerar_estado(road_length, density, v_max, p_slowdown, seed, passos_aquecimento)
+
+    # Grava em arquivo temporário e renomeia, para que leitores concorrentes
+    # nunca vejam um estado pela metade
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        np.save(f, road)
+    os.replace(temporario, caminho)
+
+    _aplicar_limite(diretorio, limite_bytes, preservar=caminho)
+    return road
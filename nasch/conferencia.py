@@ -0,0 +1,150 @@
+"""
+Conferência dos backends: confere que cada um roda e dá o resultado certo.
+
+Duas verificações:
+
+    igualdade   com p_slowdown = 0 as regras são determinísticas, então todo
+                backend e kernel deve produzir, passo a passo, a mesma soma de
+                velocidades que o sequencial com o kernel de referência
+    repeticao   roda um backend várias vezes seguidas; pega falhas
+                intermitentes (ex.: corridas entre processos) que uma única
+                execução deixaria passar
+
+As somas de cada passo são lidas por um monitor que nunca manda parar (a
+mesma interface de nasch.convergencia.MonitorConvergencia), então nenhum
+backend precisa devolver a estrada final.
+
+Uso:
+    python -m nasch.conferencia
+    python -m nasch.conferencia igualdade --backends threads processos
+    python -m nasch.conferencia repeticao --backend processos --vezes 50
+"""
+
+import argparse
+import contextlib
+import sys
+
+from nasch import backends
+from nasch.regras import KERNELS
+
+# Casos da verificação de igualdade (3 workers deixa pedaços desiguais)
+COMPRIMENTO = 2000
+DENSIDADES = [0.1, 0.3]
+PASSOS = 50
+PARALELISMO = [2, 3]
+
+
+class Registro:
+    """Monitor que só guarda a soma das velocidades de cada passo."""
+
+    def __init__(self, road_length):
+        self.road_length = road_length
+        self.somas = []
+        self.passos = 0
+        self.convergiu = False
+        self.erro_relativo = float('inf')
+
+    def adicionar(self, fluxo, velocidade_media):
+        self.passos += 1
+        self.somas.append(round(fluxo * self.road_length))
+        return False
+
+    def fim_de_lote(self, passos):
+        return False
+
+
+@contextlib.contextmanager
+def sem_aleatorizacao(lista_backends):
+    """Zera P_SLOWDOWN nos módulos dos backends enquanto durar o bloco."""
+    modulos = {b: backends.carregar_script(b) for b in lista_backends}
+    originais = {b: m.P_SLOWDOWN for b, m in modulos.items()}
+    try:
+        for m in modulos.values():
+            m.P_SLOWDOWN = 0.0
+        yield
+    finally:
+        for b, m in modulos.items():
+            m.P_SLOWDOWN = originais[b]
+
+
+def somas_por_passo(backend, road_length, density, sim_steps, paralelismo, kernel):
+    """Executa o backend e retorna a lista com a soma das velocidades de cada passo."""
+    registro = Registro(road_length)
+    backends.executar(backend, road_length, density, sim_steps, paralelismo,
+                      monitor=registro, kernel=kernel)
+    return registro.somas
+
+
+def conferir_igualdade(lista_backends=backends.BACKENDS, verbose=True):
+    """Compara cada backend e kernel com o sequencial de referência; retorna o número de falhas."""
+    falhas = 0
+    with sem_aleatorizacao(set(lista_backends) | {'sequencial'}):
+        for dens in DENSIDADES:
+            esperado = somas_por_passo('sequencial', COMPRIMENTO, dens, PASSOS, 1, 'referencia')
+
+            for backend in lista_backends:
+                for kernel in KERNELS:
+                    for p in ([1] if backend == 'sequencial' else PARALELISMO):
+                        if not backends.paralelismo_valido(backend, COMPRIMENTO, p):
+                            continue
+                        try:
+                            obtido = somas_por_passo(backend, COMPRIMENTO, dens, PASSOS, p, kernel)
+                            ok = obtido == esperado
+                            detalhe = "" if ok else f"({len(obtido)} passos, diverge do sequencial)"
+                        except Exception as erro:
+                            ok, detalhe = False, f"({type(erro).__name__}: {erro})"
+
+                        falhas += not ok
+                        if verbose:
+                            print(f"  {'OK   ' if ok else 'FALHA'} {backend}/{kernel} p={p} "
+                                  f"Dens={dens} {detalhe}")
+    return falhas
+
+
+def conferir_repeticao(backend='processos', vezes=20, road_length=COMPRIMENTO, density=0.3,
+                       sim_steps=PASSOS, paralelismo=4, verbose=True):
+    """Roda o mesmo backend 'vezes' vezes seguidas; retorna o número de falhas."""
+    falhas = 0
+    for i in range(vezes):
+        try:
+            backends.executar(backend, road_length, density, sim_steps, paralelismo)
+        except Exception as erro:
+            falhas += 1
+            if verbose:
+                print(f"  FALHA na execução {i + 1}: {type(erro).__name__}: {erro}")
+    if verbose:
+        print(f"  {backend} (p={paralelismo}): {vezes - falhas} de {vezes} execuções sem erro")
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conferência dos backends da simulação.")
+    sub = parser.add_subparsers(dest="comando")
+
+    igu = sub.add_parser("igualdade", help="Compara os backends com o sequencial (p_slowdown = 0).")
+    igu.add_argument("--backends", nargs="+", choices=backends.BACKENDS, default=list(backends.BACKENDS))
+
+    rep = sub.add_parser("repeticao", help="Roda um backend várias vezes seguidas.")
+    rep.add_argument("--backend", choices=backends.BACKENDS, default="processos")
+    rep.add_argument("--vezes", type=int, default=20)
+    rep.add_argument("--paralelismo", type=int, default=4)
+
+    args = parser.parse_args()
+
+    falhas = 0
+    if args.comando in (None, "igualdade"):
+        print("Igualdade com o sequencial (p_slowdown = 0):")
+        falhas += conferir_igualdade(args.backends if args.comando else backends.BACKENDS)
+    if args.comando in (None, "repeticao"):
+        print("Execuções repetidas:")
+        if args.comando:
+            falhas += conferir_repeticao(args.backend, args.vezes, paralelismo=args.paralelismo)
+        else:
+            falhas += conferir_repeticao('processos')
+
+    print("Tudo certo." if falhas == 0 else f"{falhas} falha(s).")
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
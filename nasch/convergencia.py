@@ -0,0 +1,118 @@
+"""
+Critério de parada adaptativo: para a simulação quando o fluxo e a velocidade
+média atingem o regime estacionário com a precisão pedida.
+
+Usa o método das médias de lotes (batch means): os passos são agrupados em
+lotes e, a cada lote fechado, calcula-se a média dos lotes e o seu erro
+padrão. A execução converge quando, para as duas grandezas,
+
+    z * erro_padrao / |media| <= erro_alvo
+
+com pelo menos 'min_lotes' lotes.
+
+O erro padrão só vale se as médias dos lotes forem quase independentes, e o
+fluxo do NaSch é autocorrelacionado por dezenas de passos (centenas perto da
+densidade crítica, ~0.1). Por isso os lotes crescem com a execução: ao
+chegar a 2 * min_lotes lotes, os pares vizinhos são juntados e o tamanho do
+lote dobra. Além disso, a execução só converge quando a autocorrelação entre
+lotes vizinhos fica abaixo de 'max_autocorrelacao'; enquanto não fica, os
+lotes continuam crescendo. Mesmo assim, perto da densidade crítica o
+erro_relativo declarado fica abaixo da dispersão real entre execuções
+independentes (o limite de passos corta parte delas).
+
+O número de passos passado às simulações continua valendo como limite
+máximo; os scripts usam PASSOS_MAXIMOS no modo adaptativo. Com os valores
+padrão, nenhuma execução para antes de tamanho_lote * min_lotes = 200 passos.
+"""
+
+import math
+
+# Limite de passos padrão no modo adaptativo (bem acima do mínimo de 200 passos,
+# para que os lotes possam crescer até ficarem independentes)
+PASSOS_MAXIMOS = 5000
+
+
+class MonitorConvergencia:
+    """
+    Acompanha, passo a passo, o fluxo e a velocidade média de uma execução.
+
+    As simulações chamam adicionar() uma vez por passo com os totais da
+    estrada inteira e param quando o retorno for True. Ao final, 'passos' e
+    'erro_relativo' descrevem o que foi alcançado.
+    """
+
+    def __init__(self, erro_alvo=0.01, tamanho_lote=20, min_lotes=10, z=1.96, max_autocorrelacao=0.1):
+        self.erro_alvo = erro_alvo
+        self.tamanho_lote = tamanho_lote  # Tamanho inicial (dobra quando os lotes enchem)
+        self.min_lotes = min_lotes
+        self.z = z
+        self.max_autocorrelacao = max_autocorrelacao
+
+        self.passos = 0
+        self.convergiu = False
+        self.erro_relativo = math.inf
+
+        # Acumuladores do lote atual e das médias dos lotes fechados
+        self._soma_lote = [0.0, 0.0]
+        self._lotes = [[], []]
+
+    def adicionar(self, fluxo, velocidade_media):
+        """Registra um passo; retorna True quando a execução convergiu."""
+        self.passos += 1
+        self._soma_lote[0] += fluxo
+        self._soma_lote[1] += velocidade_media
+
+        if self.fim_de_lote(self.passos):
+            tamanho = self.tamanho_lote_em(self.passos)
+            for k in range(2):
+                self._lotes[k].append(self._soma_lote[k] / tamanho)
+                self._soma_lote[k] = 0.0
+            self._avaliar()
+
+            # Lotes cheios: junta os pares e dobra o tamanho dos próximos
+            if len(self._lotes[0]) == 2 * self.min_lotes:
+                for k in range(2):
+                    medias = self._lotes[k]
+                    self._lotes[k] = [(a + b) / 2 for a, b in zip(medias[::2], medias[1::2])]
+
+        return self.convergiu
+
+    def tamanho_lote_em(self, passos):
+        """Tamanho do lote que fecha (ou está aberto) no passo 'passos'."""
+        tamanho = self.tamanho_lote
+        while passos > 2 * self.min_lotes * tamanho:
+            tamanho *= 2
+        return tamanho
+
+    def fim_de_lote(self, passos):
+        """Diz se, após 'passos' passos, um lote acabou de fechar."""
+        return passos > 0 and passos % self.tamanho_lote_em(passos) == 0
+
+    def _avaliar(self):
+        num_lotes = len(self._lotes[0])
+        if num_lotes < 2:
+            return
+
+        erros, autocorrelacoes = [], []
+        for medias in self._lotes:
+            media = sum(medias) / num_lotes
+            desvios = [m - media for m in medias]
+            soma_quadrados = sum(d * d for d in desvios)
+            erro_padrao = math.sqrt(soma_quadrados / (num_lotes - 1) / num_lotes)
+            erros.append(self.z * erro_padrao / abs(media) if media != 0 else math.inf)
+
+            # Autocorrelação de lag 1 entre as médias dos lotes
+            if soma_quadrados > 0:
+                autocorrelacoes.append(sum(a * b for a, b in zip(desvios, desvios[1:])) / soma_quadrados)
+
+        self.erro_relativo = max(erros)
+        self.convergiu = (num_lotes >= self.min_lotes and self.erro_relativo <= self.erro_alvo
+                          and max(autocorrelacoes, default=0.0) <= self.max_autocorrelacao)
+
+    def colunas(self, passos_max):
+        """Colunas extras para o armazenamento de resultados."""
+        return {
+            'passos_max': passos_max,
+            'erro_relativo': self.erro_relativo,
+            'erro_alvo': self.erro_alvo,
+        }
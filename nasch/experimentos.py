@@ -0,0 +1,97 @@
+"""
+Bateria de testes com escolha de backend.
+
+Com --backend auto (padrão), cada configuração roda no backend e com o número
+de workers escolhidos pelo modelo de custo (nasch.autotune). Com um backend
+fixo, --kernel escolhe a implementação das regras (nasch.regras.KERNELS).
+
+Uso:
+    python -m nasch.experimentos
+    python -m nasch.experimentos --backend threads --paralelismo 4
+    python -m nasch.experimentos --backend processos --paralelismo 4 --kernel esparso
+    python -m nasch.experimentos --erro-alvo 0.01 --passos 5000
+"""
+
+import argparse
+
+from nasch import autotune, backends, resultados
+from nasch.convergencia import MonitorConvergencia, PASSOS_MAXIMOS
+from nasch.regras import KERNELS
+
+
+def run_experiments(backend, paralelismo, comprimentos_estrada, densidades, passos_simulacao,
+                    erro_alvo=None, kernel=None):
+    """
+    Roda a bateria de testes e acrescenta cada execução ao armazenamento de resultados.
+
+    Com 'erro_alvo', cada execução para quando o fluxo converge (modo
+    adaptativo) e 'passos_simulacao' vira o limite máximo de passos.
+
+    'kernel' vale só para backend fixo (None = padrão do backend); no modo
+    auto, o modelo de custo foi calibrado com o kernel padrão de cada backend.
+    """
+    print(f"Iniciando bateria de testes (backend={backend})...")
+
+    modelo = autotune.carregar_modelo() if backend == "auto" else None
+
+    for comp in comprimentos_estrada:
+        for dens in densidades:
+
+            monitor = MonitorConvergencia(erro_alvo) if erro_alvo else None
+
+            if backend == "auto":
+                tempo, escolhido, p = autotune.executar_auto(comp, dens, passos_simulacao, modelo, monitor)
+            else:
+                escolhido, p = backend, paralelismo
+                tempo = backends.executar(backend, comp, dens, passos_simulacao, p, monitor=monitor,
+                                          kernel=kernel)
+
+            usado = kernel if backend != "auto" and kernel else backends.kernel_padrao(escolhido)
+            passos = monitor.passos if monitor else passos_simulacao
+            print(f"  Comp={comp}, Dens={dens}: {escolhido}/{usado} (p={p}) -> {tempo:.4f} segundos, "
+                  f"{passos} passos")
+
+            modulo = backends.carregar_script(escolhido)
+            linha = {
+                'backend': escolhido,
+                'comprimento': comp,
+                'densidade': dens,
+                'passos': passos,
+                'v_max': modulo.V_MAX,
+                'p_slowdown': modulo.P_SLOWDOWN,
+                'workers': p,
+                'kernel': usado,
+                'seed': 0,
+                'tempo_s': tempo,
+            }
+            if monitor:
+                linha.update(monitor.colunas(passos_simulacao))
+            resultados.anexar([linha])
+
+    print(f"\nResultados salvos em '{resultados.DIRETORIO_RESULTADOS}'.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bateria de testes do modelo NaSch.")
+    parser.add_argument("--backend", choices=("auto",) + backends.BACKENDS, default="auto")
+    parser.add_argument("--paralelismo", type=int, default=1,
+                        help="Threads/workers (ignorado com --backend auto).")
+    parser.add_argument("--comprimentos", type=int, nargs="+", default=[1000, 5000, 10000, 20000])
+    parser.add_argument("--densidades", type=float, nargs="+", default=[0.1, 0.3, 0.5])
+    parser.add_argument("--passos", type=int,
+                        help="Passos por execução (padrão: 200; no modo adaptativo é o limite "
+                             f"máximo, padrão {PASSOS_MAXIMOS}).")
+    parser.add_argument("--erro-alvo", type=float,
+                        help="Ativa o modo adaptativo com este erro relativo alvo (ex.: 0.01).")
+    parser.add_argument("--kernel", choices=list(KERNELS),
+                        help="Kernel das regras (padrão do backend; ignorado com --backend auto).")
+    args = parser.parse_args()
+    if args.passos is None:
+        args.passos = PASSOS_MAXIMOS if args.erro_alvo else 200
+
+    run_experiments(args.backend, args.paralelismo, args.comprimentos, args.densidades, args.passos,
+                    args.erro_alvo, args.kernel)
+
+
+if __name__ == "__main__":
+    main()
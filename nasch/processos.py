@@ -0,0 +1,185 @@
+"""
+Backend de processos: a estrada fica em memória compartilhada
+(multiprocessing.shared_memory) e cada processo aplica o kernel ao seu pedaço.
+
+A organização é a mesma da versão com threads (três buffers rotativos e uma
+barreira por passo), mas cada processo tem o seu interpretador, então nem o
+kernel de referência fica preso ao GIL. Fica dentro do pacote para que os
+processos filhos consigam importar a função alvo com qualquer método de início
+('fork', 'spawn' ou 'forkserver').
+
+Se um processo termina com erro, uma thread de vigia no processo principal
+quebra (abort) todas as barreiras: os demais saem em vez de esperar para
+sempre, e run_simulation_processes levanta RuntimeError.
+"""
+
+import multiprocessing
+import multiprocessing.connection
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from nasch import cache_estados
+from nasch.regras import Estado, obter_kernel
+
+# --- Parâmetros da Simulação (iguais aos das outras versões) ---
+V_MAX = 5
+P_SLOWDOWN = 0.3
+KERNEL = "vetorizado"  # Kernel das regras (ver nasch.regras.KERNELS)
+
+
+def _processo(proc_id, num_procs, road_length, sim_steps, v_max, p_slowdown, nome_memoria, kernel,
+              inicio, barreira, barreira_decisao, somas, parar):
+    """Laço de um processo: igual ao worker_thread da versão com threads."""
+    chunk_size = road_length // num_procs
+    start_index = proc_id * chunk_size
+    end_index = road_length if proc_id == num_procs - 1 else (proc_id + 1) * chunk_size
+
+    memoria = shared_memory.SharedMemory(name=nome_memoria)
+    buffers = np.ndarray((3, road_length), dtype=np.int64, buffer=memoria.buf)
+    estado = Estado(None, None, v_max, p_slowdown)
+    try:
+        passo = obter_kernel(kernel)
+        rng = np.random.default_rng()
+
+        inicio.wait()
+
+        for step in range(sim_steps):
+            estado.road = buffers[step % 3]
+            estado.next_road = buffers[(step + 1) % 3]
+
+            # Prepara o buffer do passo seguinte (só o pedaço deste processo)
+            buffers[(step + 2) % 3][start_index:end_index] = -1
+
+            somas[proc_id] = passo(estado, rng, (start_index, end_index))
+            barreira.wait()
+
+            # Modo adaptativo: o processo principal decide entre as duas barreiras
+            if barreira_decisao is not None:
+                barreira_decisao.wait()
+                if parar.value:
+                    break
+    except threading.BrokenBarrierError:
+        # Outro processo falhou e a vigia quebrou as barreiras
+        sys.exit(1)
+    finally:
+        # As visões do NumPy precisam sumir antes de fechar a memória compartilhada
+        del estado, buffers
+        memoria.close()
+
+
+def _vigiar(processos, barreiras):
+    """
+    Quebra as barreiras assim que algum processo terminar com erro.
+
+    Enquanto roda, a vigia é a única thread que colhe (join) os processos:
+    exitcode lido em duas threads ao mesmo tempo pode voltar None para uma
+    delas (o outro waitpid já colheu o processo).
+    """
+    pendentes = {p.sentinel: p for p in processos}
+    while pendentes:
+        for sentinela in multiprocessing.connection.wait(list(pendentes)):
+            processo = pendentes.pop(sentinela)
+            processo.join()
+            if processo.exitcode != 0:
+                for b in barreiras:
+                    b.abort()
+                return
+
+
+def run_simulation_processes(road_length, density, sim_steps, num_procs, kernel=KERNEL, seed=0,
+                             monitor=None):
+    """
+    Executa uma única simulação com 'num_procs' processos e retorna o tempo (s).
+
+    O tempo não inclui a criação dos processos: todos esperam numa barreira de
+    início depois de se ligar à memória compartilhada.
+
+    Com um 'monitor' (nasch.convergencia.MonitorConvergencia), o processo
+    principal entra nas barreiras, alimenta o monitor com as somas de cada
+    passo e publica a decisão em 'parar' (uma segunda barreira por passo, só
+    neste modo); 'sim_steps' vira o limite de passos.
+
+    Kernel desconhecido levanta ValueError antes de criar os processos; erro
+    dentro de um processo levanta RuntimeError.
+    """
+    obter_kernel(kernel)
+
+    num_cars = int(road_length * density)
+    if num_cars == 0:
+        return 0.0
+
+    road = cache_estados.estado_inicial(road_length, density, V_MAX, P_SLOWDOWN, seed)
+
+    # Três buffers rotativos num único bloco compartilhado
+    memoria = shared_memory.SharedMemory(create=True, size=3 * road_length * np.dtype(np.int64).itemsize)
+    buffers = None
+    try:
+        buffers = np.ndarray((3, road_length), dtype=np.int64, buffer=memoria.buf)
+        buffers[0] = road
+        buffers[1:] = -1
+
+        # O processo principal só participa das barreiras no modo adaptativo
+        participantes = num_procs + (1 if monitor is not None else 0)
+        inicio = multiprocessing.Barrier(num_procs + 1)
+        barreira = multiprocessing.Barrier(participantes)
+        barreira_decisao = multiprocessing.Barrier(participantes) if monitor is not None else None
+        somas = multiprocessing.Array('q', num_procs, lock=False)
+        parar = multiprocessing.Value('b', False, lock=False)
+
+        processos = [
+            multiprocessing.Process(
+                target=_processo,
+                args=(i, num_procs, road_length, sim_steps, V_MAX, P_SLOWDOWN, memoria.name, kernel,
+                      inicio, barreira, barreira_decisao, somas, parar)
+            )
+            for i in range(num_procs)
+        ]
+        for p in processos:
+            p.start()
+
+        barreiras = [b for b in (inicio, barreira, barreira_decisao) if b is not None]
+        vigia = threading.Thread(target=_vigiar, args=(processos, barreiras), daemon=True)
+        vigia.start()
+
+        try:
+            inicio.wait()
+            start_time = time.perf_counter()
+
+            if monitor is not None:
+                for _ in range(sim_steps):
+                    barreira.wait()
+                    soma_v = sum(somas)
+                    parar.value = monitor.adicionar(soma_v / road_length, soma_v / num_cars)
+                    barreira_decisao.wait()
+                    if parar.value:
+                        break
+        except threading.BrokenBarrierError:
+            pass  # Algum processo falhou: o erro é levantado depois do join
+        except BaseException:
+            # Erro no próprio processo principal: libera os filhos antes de sair
+            for b in barreiras:
+                b.abort()
+            vigia.join()
+            for p in processos:
+                p.join()
+            raise
+
+        # Só colhe os processos depois da vigia (que pode ter parado antes, num erro)
+        vigia.join()
+        for p in processos:
+            p.join()
+
+        end_time = time.perf_counter()
+
+        if any(p.exitcode != 0 for p in processos):
+            raise RuntimeError("Um dos processos da simulação terminou com erro.")
+    finally:
+        buffers = None  # Solta a visão do NumPy antes de fechar
+        memoria.close()
+        memoria.unlink()
+
+    return end_time - start_time
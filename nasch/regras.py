@@ -0,0 +1,174 @@
+"""
+Regras do modelo NaSch: kernels intercambiáveis usados por todos os backends.
+
+Todo kernel tem a mesma interface:
+
+    soma_v = passo(estado, rng, segmento)
+
+Ele aplica as quatro regras (distância, aceleração, desaceleração,
+aleatorização e movimento) aos carros de estado.road[inicio:fim] e escreve os
+carros nas novas posições de estado.next_road, que deve chegar limpa nessas
+posições. A estrada é circular: os últimos carros do segmento enxergam as
+v_max + 1 células seguintes (com 'wrap-around'). Cada carro pertence a um único
+segmento, então vários segmentos podem ser calculados ao mesmo tempo sobre o
+mesmo estado. 'rng' é um numpy.random.Generator. O retorno é a soma das novas
+velocidades, usada para medir o fluxo.
+
+Kernels disponíveis (KERNELS):
+
+    referencia  laço célula a célula em Python (o algoritmo original)
+    vetorizado  NumPy sobre as posições ocupadas; libera o GIL nos laços internos
+    esparso     laço em Python só sobre os carros; sem o custo fixo do NumPy,
+                bom para segmentos pequenos (bordas) e densidades baixas
+"""
+
+import numpy as np
+
+
+class Estado:
+    """
+    Estado de um passo: lido de 'road' e escrito em 'next_road'.
+
+    Os backends trocam os buffers entre os passos atribuindo 'road' e
+    'next_road'; os kernels não guardam nada entre as chamadas.
+    """
+
+    def __init__(self, road, next_road, v_max, p_slowdown):
+        self.road = road
+        self.next_road = next_road
+        self.v_max = v_max
+        self.p_slowdown = p_slowdown
+
+
+def passo_referencia(estado, rng, segmento):
+    """Laço célula a célula (igual à versão sequencial original)."""
+    road, next_road = estado.road, estado.next_road
+    v_max = estado.v_max
+    start_index, end_index = segmento
+    road_length = len(road)
+
+    # Um sorteio por célula do segmento (só os das células com carro são usados)
+    sorteios = rng.random(end_index - start_index)
+    soma_v = 0
+
+    for i in range(start_index, end_index):
+
+        # Se a célula NÃO tiver um carro, pule
+        if road[i] == -1:
+            continue
+
+        v_atual = road[i]
+
+        # Regra 0: distância até o próximo carro, com 'wrap-around'; além de
+        # v_max + 1 a distância não limita mais a velocidade
+        distancia = 1
+        while road[(i + distancia) % road_length] == -1:
+            distancia += 1
+            if distancia > v_max + 1:
+                break
+
+        # Regra 1: Aceleração
+        v_nova = min(v_atual + 1, v_max)
+
+        # Regra 2: Desaceleração (evitar colisão)
+        v_nova = min(v_nova, distancia - 1)
+
+        # Regra 3: Aleatorização
+        if v_nova > 0 and sorteios[i - start_index] < estado.p_slowdown:
+            v_nova -= 1
+
+        # Regra 4: Movimento
+        next_road[(i + v_nova) % road_length] = v_nova
+        soma_v += v_nova
+
+    return int(soma_v)
+
+
+def passo_vetorizado(estado, rng, segmento):
+    """Regras em NumPy sobre as posições ocupadas do segmento."""
+    road, next_road = estado.road, estado.next_road
+    v_max = estado.v_max
+    start_index, end_index = segmento
+    road_length = len(road)
+
+    # Pedaço + olhada à frente (v_max + 1 células)
+    indices_frente = np.arange(end_index, end_index + v_max + 1) % road_length
+    trecho = np.concatenate((road[start_index:end_index], road[indices_frente]))
+
+    # Posições ocupadas no trecho; os carros a mover são os que estão no pedaço
+    ocupadas = np.flatnonzero(trecho != -1)
+    num_carros = np.searchsorted(ocupadas, end_index - start_index)
+    if num_carros == 0:
+        return 0
+    carros = ocupadas[:num_carros]
+
+    # Regra 0: distância até o próximo carro (sentinela distante se não houver)
+    seguintes = np.append(ocupadas[1:], len(trecho) + v_max + 1)[:num_carros]
+    distancia = seguintes - carros
+
+    # Regras 1 e 2: aceleração e desaceleração (evitar colisão)
+    v_nova = np.minimum(np.minimum(trecho[carros] + 1, v_max), distancia - 1)
+
+    # Regra 3: aleatorização
+    v_nova -= (v_nova > 0) & (rng.random(num_carros) < estado.p_slowdown)
+
+    # Regra 4: movimento
+    next_road[(carros + start_index + v_nova) % road_length] = v_nova
+
+    return int(v_nova.sum())
+
+
+def passo_esparso(estado, rng, segmento):
+    """Laço em Python apenas sobre os carros do segmento."""
+    road, next_road = estado.road, estado.next_road
+    v_max = estado.v_max
+    start_index, end_index = segmento
+    road_length = len(road)
+
+    # Posições (relativas ao início) dos carros do pedaço e da olhada à frente
+    pedaco = road[start_index:end_index]
+    ocupadas = np.flatnonzero(pedaco != -1)
+    num_carros = len(ocupadas)
+    if num_carros == 0:
+        return 0
+
+    indices_frente = np.arange(end_index, end_index + v_max + 1) % road_length
+    frente = np.flatnonzero(road[indices_frente] != -1) + (end_index - start_index)
+
+    # Sentinela distante: sem carro à frente, a distância não limita a velocidade
+    posicoes = ocupadas.tolist() + frente.tolist() + [end_index - start_index + 2 * (v_max + 1)]
+    velocidades = pedaco[ocupadas].tolist()
+    sorteios = rng.random(num_carros).tolist()
+    p_slowdown = estado.p_slowdown
+
+    destinos = [0] * num_carros
+    novas = [0] * num_carros
+    for k in range(num_carros):
+        # Regras 0 a 2: distância, aceleração e desaceleração
+        v_nova = min(velocidades[k] + 1, v_max, posicoes[k + 1] - posicoes[k] - 1)
+
+        # Regra 3: aleatorização
+        if v_nova > 0 and sorteios[k] < p_slowdown:
+            v_nova -= 1
+
+        destinos[k] = posicoes[k] + v_nova
+        novas[k] = v_nova
+
+    # Regra 4: movimento (uma única escrita para todos os carros)
+    next_road[(np.array(destinos) + start_index) % road_length] = novas
+
+    return sum(novas)
+
+
+KERNELS = {
+    'referencia': passo_referencia,
+    'vetorizado': passo_vetorizado,
+    'esparso': passo_esparso,
+}
+
+
+def obter_kernel(nome):
+    """Retorna o kernel registrado com este nome."""
+    if nome not in KERNELS:
+        raise ValueError(f"Kernel desconhecido: {nome!r}. Opções: {', '.join(KERNELS)}")
+    return KERNELS[nome]
@@ -0,0 +1,92 @@
+"""
+Armazenamento colunar, somente de acréscimo, dos resultados das execuções.
+
+Cada chamada a anexar() grava um novo segmento .npz (uma coluna por campo)
+em arquivos/resultados/. Nenhum segmento é reescrito, então acrescentar uma
+execução custa o mesmo independentemente do tamanho do histórico.
+
+Todos os backends usam o mesmo esquema (ESQUEMA). Colunas extras (ex.: tempos
+por fase) são gravadas como float64. Segmentos gravados antes da coluna
+'kernel' são lidos com ela vazia.
+"""
+
+import os
+import time
+import uuid
+
+import numpy as np
+
+from nasch.backends import RAIZ
+
+DIRETORIO_RESULTADOS = os.path.join(RAIZ, "arquivos", "resultados")
+
+# Colunas comuns a todas as execuções
+ESQUEMA = {
+    'backend': np.dtype('U16'),
+    'comprimento': np.dtype(np.int64),
+    'densidade': np.dtype(np.float64),
+    'passos': np.dtype(np.int64),
+    'v_max': np.dtype(np.int64),
+    'p_slowdown': np.dtype(np.float64),
+    'workers': np.dtype(np.int64),
+    'kernel': np.dtype('U16'),
+    'seed': np.dtype(np.int64),
+    'tempo_s': np.dtype(np.float64),
+}
+
+
+def anexar(linhas, diretorio=DIRETORIO_RESULTADOS):
+    """
+    Grava as linhas (lista de dicts) como um novo segmento e retorna o nome dele.
+
+    Toda linha precisa ter as colunas de ESQUEMA; campos a mais viram colunas
+    float64 (NaN nas linhas que não os têm).
+    """
+    if not linhas:
+        return None
+
+    faltando = [c for c in ESQUEMA if any(c not in linha for linha in linhas)]
+    if faltando:
+        raise ValueError(f"Linhas sem as colunas obrigatórias: {', '.join(faltando)}")
+
+    colunas = {c: np.array([linha[c] for linha in linhas], dtype=t) for c, t in ESQUEMA.items()}
+
+    extras = sorted({c for linha in linhas for c in linha} - set(ESQUEMA))
+    for c in extras:
+        colunas[c] = np.array([linha.get(c, np.nan) for linha in linhas], dtype=np.float64)
+
+    os.makedirs(diretorio, exist_ok=True)
+
+    # Nome ordenável pelo instante de gravação; pid + uuid evitam colisões
+    nome = f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}.npz"
+    caminho = os.path.join(diretorio, nome)
+
+    # Grava em arquivo temporário e renomeia: leitores nunca veem meio segmento
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as f:
+        np.savez(f, **colunas)
+    os.replace(temporario, caminho)
+
+    return nome
+
+
+def listar_segmentos(diretorio=DIRETORIO_RESULTADOS):
+    """Nomes dos segmentos existentes, em ordem de gravação."""
+    if not os.path.isdir(diretorio):
+        return []
+    return sorted(n for n in os.listdir(diretorio) if n.endswith(".npz"))
+
+
+def ler_segmento(nome, diretorio=DIRETORIO_RESULTADOS):
+    """
+    Lê um segmento e retorna {coluna: array}.
+
+    Segmentos gravados antes de 'kernel' entrar no esquema recebem a coluna
+    vazia ('').
+    """
+    with np.load(os.path.join(diretorio, nome)) as dados:
+        segmento = {c: dados[c] for c in dados.files}
+    if 'kernel' not in segmento:
+        segmento['kernel'] = np.full(len(segmento['tempo_s']), '', dtype=ESQUEMA['kernel'])
+    return segmento
+
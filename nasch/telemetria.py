@@ -0,0 +1,238 @@
+"""
+Telemetria ao vivo do Mestre distribuído, servida como linhas JSON.
+
+O Mestre abre um socket TCP local (por padrão 127.0.0.1:65433) e, a cada
+INTERVALO segundos, envia a todos os clientes conectados uma linha JSON com:
+
+    passo        menor passo concluído entre os workers (o passo "atual")
+    passo_max    maior passo concluído
+    passos_s     passos por segundo, média móvel das últimas JANELA segundos
+    celulas_s    atualizações de células por segundo (passos_s * comprimento)
+    ultimo       worker mais atrasado (o último a chegar ao passo atual);
+                 null se todos estão no mesmo passo
+    atraso       passo_max - passo
+    workers      por worker: passo, bytes recebidos dele e enviados a ele pelo
+                 Mestre, e quantas amostras ele foi o último
+
+O custo no caminho quente é só atualizar três contadores por passo em listas
+indexadas pelo worker (cada posição é escrita por uma única thread). A taxa e
+o worker atrasado são calculados pela thread de amostragem, poucas vezes por
+segundo; o JSON só é montado quando há clientes conectados.
+
+Como não há barreira global, "o último a chegar à barreira" vira o worker com
+o menor contador de passos no instante da amostra.
+
+Uso (em outro terminal, com o Mestre rodando):
+    python -m nasch.telemetria
+    python -m nasch.telemetria --json
+"""
+
+import argparse
+import collections
+import json
+import socket
+import sys
+import threading
+import time
+
+HOST = '127.0.0.1'
+PORTA = 65433
+INTERVALO = 0.5  # Segundos entre amostras
+JANELA = 5.0     # Segundos da média móvel de passos/s
+
+
+class Telemetria:
+    """
+    Servidor de telemetria de um Mestre.
+
+    Vive enquanto o Mestre existir (os clientes continuam conectados entre uma
+    execução e outra); cada execução começa com nova_execucao() e termina com
+    fim_execucao(), que envia uma última amostra com 'fim': true.
+    """
+
+    def __init__(self, host=HOST, porta=PORTA, intervalo=INTERVALO, janela=JANELA):
+        self.host = host
+        self.porta = porta
+        self.intervalo = intervalo
+        self.janela = janela
+
+        self._clientes = []
+        self._lock_clientes = threading.Lock()
+        self._servidor = None
+        self._fechado = threading.Event()
+        self._execucao = None
+
+    def iniciar(self):
+        """Abre o socket e inicia as threads de conexão e de amostragem (OSError se a porta estiver em uso)."""
+        self._servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._servidor.bind((self.host, self.porta))
+        self._servidor.listen()
+        self._servidor.settimeout(self.intervalo)
+
+        threading.Thread(target=self._loop_conexoes, daemon=True).start()
+        threading.Thread(target=self._loop_amostragem, daemon=True).start()
+
+    def nova_execucao(self, num_workers, road_length, sim_steps):
+        """Zera os contadores para uma nova simulação."""
+        self._execucao = {
+            'inicio': time.perf_counter(),
+            'comprimento': road_length,
+            'passos_total': sim_steps,
+            'passos': [0] * num_workers,
+            'bytes_recebidos': [0] * num_workers,
+            'bytes_enviados': [0] * num_workers,
+            'vezes_ultimo': [0] * num_workers,
+            'historico': collections.deque(maxlen=max(2, int(self.janela / self.intervalo) + 1)),
+        }
+
+    def contar_bytes(self, worker_id, recebidos=0, enviados=0):
+        """Soma bytes trocados com o worker (chamado só pela thread dele)."""
+        execucao = self._execucao
+        execucao['bytes_recebidos'][worker_id] += recebidos
+        execucao['bytes_enviados'][worker_id] += enviados
+
+    def passo_concluido(self, worker_id):
+        """Marca mais um passo concluído pelo worker (chamado só pela thread dele)."""
+        self._execucao['passos'][worker_id] += 1
+
+    def fim_execucao(self):
+        """Envia a amostra final da execução e para de amostrar."""
+        execucao, self._execucao = self._execucao, None
+        if execucao is not None:
+            self._publicar(self._amostrar(execucao, fim=True))
+
+    def fechar(self):
+        """Encerra o servidor e desconecta os clientes."""
+        self._fechado.set()
+        if self._servidor is not None:
+            self._servidor.close()
+        with self._lock_clientes:
+            for cliente in self._clientes:
+                cliente.close()
+            self._clientes = []
+
+    def _amostrar(self, execucao, fim=False):
+        agora = time.perf_counter()
+        passos = list(execucao['passos'])
+        passo = min(passos)
+        ultimo = None
+        if max(passos) > passo:
+            ultimo = passos.index(passo)
+            execucao['vezes_ultimo'][ultimo] += 1
+
+        # Média móvel de passos/s pelo passo atual (o do worker mais atrasado)
+        historico = execucao['historico']
+        historico.append((agora, passo))
+        t0, p0 = historico[0]
+        passos_s = (passo - p0) / (agora - t0) if agora > t0 else 0.0
+
+        return {
+            'tempo': round(agora - execucao['inicio'], 3),
+            'passo': passo,
+            'passo_max': max(passos),
+            'passos_total': execucao['passos_total'],
+            'passos_s': round(passos_s, 2),
+            'celulas_s': round(passos_s * execucao['comprimento']),
+            'ultimo': ultimo,
+            'atraso': max(passos) - passo,
+            'workers': [
+                {
+                    'id': i,
+                    'passo': passos[i],
+                    'bytes_recebidos': execucao['bytes_recebidos'][i],
+                    'bytes_enviados': execucao['bytes_enviados'][i],
+                    'vezes_ultimo': execucao['vezes_ultimo'][i],
+                }
+                for i in range(len(passos))
+            ],
+            'fim': fim,
+        }
+
+    def _publicar(self, amostra):
+        with self._lock_clientes:
+            if not self._clientes:
+                return
+            linha = (json.dumps(amostra) + "\n").encode()
+            for cliente in list(self._clientes):
+                try:
+                    cliente.sendall(linha)
+                except OSError:
+                    # Cliente lento ou desconectado: é descartado
+                    cliente.close()
+                    self._clientes.remove(cliente)
+
+    def _loop_conexoes(self):
+        while not self._fechado.is_set():
+            try:
+                cliente, _ = self._servidor.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # Servidor fechado
+            cliente.settimeout(self.intervalo)
+            with self._lock_clientes:
+                self._clientes.append(cliente)
+
+    def _loop_amostragem(self):
+        while not self._fechado.wait(self.intervalo):
+            execucao = self._execucao
+            if execucao is None:
+                continue
+            amostra = self._amostrar(execucao)
+            # Não publica depois da amostra final (fim_execucao pode ter corrido)
+            if self._clientes and self._execucao is execucao:
+                self._publicar(amostra)
+
+
+def formatar(amostra):
+    """Linha legível de uma amostra."""
+    recebidos = sum(w['bytes_recebidos'] for w in amostra['workers'])
+    enviados = sum(w['bytes_enviados'] for w in amostra['workers'])
+    linha = (f"[{amostra['tempo']:8.1f} s] passo {amostra['passo']}/{amostra['passos_total']} | "
+             f"{amostra['passos_s']:.1f} passos/s | {amostra['celulas_s']:.3g} células/s | "
+             f"último: {'-' if amostra['ultimo'] is None else 'worker %d' % amostra['ultimo']} "
+             f"(atraso {amostra['atraso']}) | "
+             f"rx {recebidos / 1e6:.2f} MB, tx {enviados / 1e6:.2f} MB")
+    if amostra['fim']:
+        linha += " | FIM"
+    return linha
+
+
+def acompanhar(host=HOST, porta=PORTA, bruto=False, esperar=True):
+    """Conecta ao Mestre e imprime as amostras até a conexão fechar."""
+    while True:
+        try:
+            conexao = socket.create_connection((host, porta))
+            break
+        except ConnectionRefusedError:
+            if not esperar:
+                print(f"Nenhum Mestre com telemetria em {host}:{porta}.", file=sys.stderr)
+                return
+            time.sleep(1.0)
+
+    # Mensagens de estado vão para stderr: com --json, stdout tem só as linhas JSON
+    print(f"Conectado à telemetria em {host}:{porta}.", file=sys.stderr)
+    with conexao, conexao.makefile('r', encoding='utf-8') as linhas:
+        for linha in linhas:
+            print(linha.rstrip() if bruto else formatar(json.loads(linha)), flush=True)
+    print("Mestre desconectou.", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Acompanha a telemetria do Mestre distribuído.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--porta", type=int, default=PORTA)
+    parser.add_argument("--json", action="store_true", help="Imprime as linhas JSON sem formatar.")
+    parser.add_argument("--sem-esperar", action="store_true",
+                        help="Sai se o Mestre ainda não estiver escutando.")
+    args = parser.parse_args()
+
+    try:
+        acompanhar(args.host, args.porta, args.json, not args.sem_esperar)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()